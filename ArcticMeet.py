@@ -1,5 +1,6 @@
 # Import libraries
 import streamlit as st
+from utils import config
 
 # Set the page configuration
 st.set_page_config(
@@ -108,6 +109,18 @@ def main():
         st.switch_page("pages/1_Upload_a_meeting.py")
 
 
+# Load the ASR model in the background only once per server process, so the first transcription doesn't have to wait for it
+@st.cache_resource(show_spinner=False)
+def preload_asr_model():
+    from utils.asr import preload_asr_pipeline
+
+    return preload_asr_pipeline()
+
+
 if __name__ == "__main__":
+    # Preload the ASR model if enabled
+    if config.PRELOAD_ASR:
+        preload_asr_model()
+
     # Run the main function
     main()
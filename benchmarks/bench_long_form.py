@@ -0,0 +1,66 @@
+# Benchmark the long-form (chunked and batched) transcription against transcribing the whole meeting in one call
+# Usage: python -m benchmarks.bench_long_form --meeting sample_meeting.mp4 --minutes 30 60 120
+
+# Import libraries
+import argparse
+import time
+
+import numpy as np
+
+from utils import config
+from utils.asr import get_asr_pipeline, transcribe
+from utils.audio import load_audio
+
+
+# Define a function to build a recording of the given length by repeating a sample meeting
+def build_recording(sample_audio, minutes):
+    samples = int(minutes * 60 * config.SAMPLING_RATE)
+    repeats = -(-samples // sample_audio.shape[0])
+
+    return np.tile(sample_audio, repeats)[:samples]
+
+
+# Define a function to time a single transcription
+def time_transcription(audio, **kwargs):
+    start_time = time.perf_counter()
+    transcription = transcribe(audio, **kwargs)
+    elapsed = time.perf_counter() - start_time
+
+    return elapsed, len(transcription["text"].split())
+
+
+# Define the main function
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark long-form transcription against a single pipeline call"
+    )
+    parser.add_argument(
+        "--meeting", required=True, help="Meeting to build the recordings from"
+    )
+    parser.add_argument("--minutes", type=float, nargs="+", default=[30, 60, 120])
+    parser.add_argument("--model", default=config.ASR_MODEL)
+    parser.add_argument("--batch-size", type=int, default=config.ASR_BATCH_SIZE)
+    args = parser.parse_args()
+
+    sample_audio = load_audio(args.meeting)
+
+    # Load the model before timing anything
+    get_asr_pipeline(args.model)
+
+    print(f"{'minutes':>8} {'mode':>10} {'seconds':>10} {'RTF':>8} {'words':>8}")
+    for minutes in args.minutes:
+        audio = build_recording(sample_audio, minutes)
+
+        for mode, kwargs in (
+            ("current", {"long_form": False}),
+            ("long-form", {"long_form": True, "batch_size": args.batch_size}),
+        ):
+            elapsed, words = time_transcription(audio, model_name=args.model, **kwargs)
+            print(
+                f"{minutes:>8g} {mode:>10} {elapsed:>10.1f} {elapsed / (minutes * 60):>8.3f} {words:>8}"
+            )
+
+
+if __name__ == "__main__":
+    # Run the main function
+    main()
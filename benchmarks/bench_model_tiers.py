@@ -0,0 +1,103 @@
+# Benchmark the real-time factor and peak memory of every Whisper model tier, with and without int8 quantization
+# Every tier runs in its own process, so the peak memory of one tier doesn't affect the next one
+# Usage: python -m benchmarks.bench_model_tiers --meeting sample_meeting.mp4 --minutes 10
+
+# Import libraries
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from utils import config
+
+
+# Define a function to benchmark one tier in the current process and print the result as JSON
+def run_tier(meeting, minutes, model_name, quantize):
+    from benchmarks.bench_long_form import build_recording
+    from utils.asr import get_asr_pipeline, transcribe
+    from utils.audio import load_audio
+
+    audio = build_recording(load_audio(meeting), minutes)
+
+    start_time = time.perf_counter()
+    get_asr_pipeline(model_name, quantize)
+    load_s = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    transcription = transcribe(audio, model_name=model_name, quantize=quantize)
+    transcribe_s = time.perf_counter() - start_time
+
+    # ru_maxrss is in kilobytes on Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    print(
+        json.dumps(
+            {
+                "load_s": load_s,
+                "transcribe_s": transcribe_s,
+                "rtf": transcribe_s / (minutes * 60),
+                "peak_rss_mb": peak_rss_mb,
+                "words": len(transcription["text"].split()),
+            }
+        )
+    )
+
+
+# Define the main function
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the real-time factor and peak memory of every Whisper model tier"
+    )
+    parser.add_argument(
+        "--meeting", required=True, help="Meeting to build the recording from"
+    )
+    parser.add_argument("--minutes", type=float, default=10)
+    parser.add_argument(
+        "--tiers", nargs="+", default=list(config.ASR_MODEL_TIERS), help="Tiers to run"
+    )
+    parser.add_argument("--run-tier", help=argparse.SUPPRESS)
+    parser.add_argument("--quantize", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_tier:
+        run_tier(
+            args.meeting,
+            args.minutes,
+            config.ASR_MODEL_TIERS[args.run_tier],
+            args.quantize,
+        )
+        return
+
+    print(
+        f"{'tier':>18} {'int8':>5} {'load s':>8} {'RTF':>8} {'peak RSS MB':>12} {'words':>7}"
+    )
+    for tier in args.tiers:
+        for quantize in (False, True):
+            command = [
+                sys.executable,
+                "-m",
+                "benchmarks.bench_model_tiers",
+                "--meeting",
+                args.meeting,
+                "--minutes",
+                str(args.minutes),
+                "--run-tier",
+                tier,
+            ]
+            if quantize:
+                command.append("--quantize")
+
+            output = subprocess.run(
+                command, stdout=subprocess.PIPE, check=True, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{tier:>18} {'yes' if quantize else 'no':>5} {result['load_s']:>8.1f} {result['rtf']:>8.3f} {result['peak_rss_mb']:>12.0f} {result['words']:>7}"
+            )
+
+
+if __name__ == "__main__":
+    # Run the main function
+    main()
@@ -0,0 +1,79 @@
+# Benchmark the latency of the full-text search of Step 2 on a catalog of synthetic meetings
+# Usage: python -m benchmarks.bench_search --meetings 10000
+
+# Import libraries
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from utils import config
+
+# Words the synthetic meetings are made of
+WORDS = (
+    "agenda budget customer deadline design feature hiring invoice launch marketing "
+    "meeting metrics onboarding partner pricing product quarter release revenue roadmap "
+    "sales security sprint support team timeline update vendor we they discussed agreed "
+    "the a of to and in for on with about next last week month plan review decision"
+).split()
+
+# Queries the search is benchmarked with
+QUERIES = ["pricing", "pricing roadmap", "customer support", "rel", "hiring plan"]
+
+
+# Define a function to build a synthetic meeting of about the given number of words
+def build_meeting(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+# Define the main function
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the full-text search of Step 2"
+    )
+    parser.add_argument("--meetings", type=int, default=10000)
+    parser.add_argument(
+        "--words", type=int, default=2000, help="Words per synthetic meeting"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=20, help="Times every query is run"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Use a throwaway catalog, so the benchmark doesn't touch the real one
+        config.TRANSCRIPT_DB_PATH = os.path.join(directory, "transcripts.sqlite3")
+        from utils import transcript_store
+
+        rng = random.Random(0)
+        start_time = time.perf_counter()
+        for meeting in range(args.meetings):
+            transcript_store.add(
+                f"{meeting:064x}",
+                "benchmark",
+                f"Meeting {meeting}.mp4",
+                build_meeting(rng, args.words),
+            )
+        print(
+            f"Stored {args.meetings} meetings in {time.perf_counter() - start_time:.1f} s"
+        )
+
+        print(f"{'query':>18} {'results':>8} {'p50 ms':>8} {'p95 ms':>8}")
+        for query in QUERIES:
+            latencies = []
+            for _ in range(args.repeat):
+                start_time = time.perf_counter()
+                results = transcript_store.search(query)
+                latencies.append((time.perf_counter() - start_time) * 1000)
+
+            latencies.sort()
+            print(
+                f"{query:>18} {len(results):>8} {statistics.median(latencies):>8.1f} {latencies[int(len(latencies) * 0.95) - 1]:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    # Run the main function
+    main()
@@ -0,0 +1,162 @@
+# Benchmark the cold start of ArcticMeet.py and every page against the budget in benchmarks/startup_budget.json
+# Every script runs in its own process, so modules imported by one script don't make the next one look faster
+# Measures the time to import the modules of the script, the first run of the script and a rerun, and checks that no heavy module is imported before it's needed
+# Exits with an error if a script is over its budget, so regressions show up
+# Usage: python -m benchmarks.bench_startup [--update-budget]
+
+# Import libraries
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Path of the tracked budget
+BUDGET_PATH = os.path.join(os.path.dirname(__file__), "startup_budget.json")
+
+# Headroom added to the measured times when the budget is updated
+BUDGET_HEADROOM = 1.5
+
+# Smallest headroom (in seconds), so times of a few milliseconds don't fail on noise
+BUDGET_MIN_HEADROOM_S = 0.05
+
+
+# Define a function to get the top-level import statements of a script
+def get_import_statements(script):
+    with open(script, encoding="utf-8") as file:
+        tree = ast.parse(file.read(), filename=script)
+
+    return ast.unparse(
+        ast.Module(
+            body=[
+                node
+                for node in tree.body
+                if isinstance(node, (ast.Import, ast.ImportFrom))
+            ],
+            type_ignores=[],
+        )
+    )
+
+
+# Define a function to benchmark one script in the current process and print the result as JSON
+def run_script(script, heavy_modules):
+    # Streamlit itself is loaded by the server before any script runs, so it's not part of the budget
+    import streamlit  # noqa: F401
+    from streamlit.testing.v1 import AppTest
+
+    # The imports run in an app of their own, since Streamlit components can only be declared while a script runs
+    imports_app = AppTest.from_string(
+        get_import_statements(script), default_timeout=120
+    )
+    start_time = time.perf_counter()
+    imports_app.run()
+    import_s = time.perf_counter() - start_time
+    if imports_app.exception:
+        raise RuntimeError(imports_app.exception[0].message)
+
+    app = AppTest.from_file(script, default_timeout=120)
+
+    # Run without Snowflake credentials, so Step 3 asks for them instead of failing to read the secrets
+    for secret in (
+        "SNOWFLAKE_ACCOUNT",
+        "SNOWFLAKE_USER_NAME",
+        "SNOWFLAKE_USER_PASSWORD",
+    ):
+        app.secrets[secret] = ""
+
+    start_time = time.perf_counter()
+    app.run()
+    first_run_s = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    app.run()
+    rerun_s = time.perf_counter() - start_time
+
+    print(
+        json.dumps(
+            {
+                "import_s": import_s,
+                "first_run_s": first_run_s,
+                "rerun_s": rerun_s,
+                "heavy_modules": sorted(
+                    module for module in heavy_modules if module in sys.modules
+                ),
+            }
+        )
+    )
+
+
+# Define the main function
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the cold start of ArcticMeet.py and every page"
+    )
+    parser.add_argument(
+        "--update-budget",
+        action="store_true",
+        help="Write the measured times (with headroom) to the budget instead of checking them",
+    )
+    parser.add_argument("--run-script", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    with open(BUDGET_PATH, encoding="utf-8") as file:
+        budget = json.load(file)
+
+    if args.run_script:
+        run_script(args.run_script, budget["heavy_modules"])
+        return
+
+    over_budget = []
+    print(
+        f"{'script':>36} {'import s':>9} {'1st run s':>10} {'rerun s':>8}  heavy modules"
+    )
+    for script, script_budget in budget["scripts"].items():
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_startup", "--run-script", script],
+            stdout=subprocess.PIPE,
+            check=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{script:>36} {result['import_s']:>9.2f} {result['first_run_s']:>10.2f} {result['rerun_s']:>8.2f}  {', '.join(result['heavy_modules']) or '-'}"
+        )
+
+        if args.update_budget:
+            for metric in script_budget:
+                script_budget[metric] = round(
+                    max(
+                        result[metric] * BUDGET_HEADROOM,
+                        result[metric] + BUDGET_MIN_HEADROOM_S,
+                    ),
+                    2,
+                )
+            continue
+
+        for metric, limit in script_budget.items():
+            if result[metric] > limit:
+                over_budget.append(
+                    f"{script}: {metric} is {result[metric]:.2f} s (budget {limit} s)"
+                )
+        for module in result["heavy_modules"]:
+            over_budget.append(f"{script}: imports {module} on startup")
+
+    if args.update_budget:
+        with open(BUDGET_PATH, "w", encoding="utf-8") as file:
+            json.dump(budget, file, indent=2)
+            file.write("\n")
+        print(f"Budget updated in {BUDGET_PATH}")
+        return
+
+    if over_budget:
+        print("\nOver budget:")
+        for line in over_budget:
+            print(f"  {line}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    # Run the main function
+    main()
@@ -0,0 +1,102 @@
+# Benchmark how long Step 3 takes to get the selected transcription with 1,000 stored transcriptions
+# Compares the old lookup (a DataFrame of every transcription in the session state, searched with a boolean mask) with the transcript catalog and a memoized handle
+# Usage: python -m benchmarks.bench_transcript_lookup --transcripts 1000
+
+# Import libraries
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+from utils import config
+
+# Words the synthetic transcriptions are made of
+WORDS = "we discussed the pricing roadmap budget release customer support hiring plan next quarter".split()
+
+
+# Define a function to get a transcription the way Step 3 used to, from every transcription in the session state
+def dataframe_lookup(session_state, selected_transcription_key):
+    transcription_data = {"Key": [], "Value": []}
+    for key in session_state.keys():
+        if key.startswith("transcription_"):
+            transcription_data["Key"].append(key)
+            transcription_data["Value"].append(session_state[key])
+
+    transcription_df = pd.DataFrame(transcription_data)
+    index = transcription_df.index[
+        transcription_df["Key"] == selected_transcription_key
+    ].tolist()
+
+    return transcription_df.loc[index[0], "Value"]
+
+
+# Define a function to get the average time of a lookup in microseconds
+def time_lookup(lookup, repeat):
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        lookup()
+    return (time.perf_counter() - start_time) / repeat * 1e6
+
+
+# Define the main function
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the lookup of the selected transcription in Step 3"
+    )
+    parser.add_argument("--transcripts", type=int, default=1000)
+    parser.add_argument(
+        "--words", type=int, default=8000, help="Words per synthetic transcription"
+    )
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Use a throwaway catalog, so the benchmark doesn't touch the real one
+        config.TRANSCRIPT_DB_PATH = os.path.join(directory, "transcripts.sqlite3")
+        from utils import transcript_store
+
+        rng = random.Random(0)
+        session_state = {}
+        transcript_ids = []
+        for transcript in range(args.transcripts):
+            text = " ".join(rng.choice(WORDS) for _ in range(args.words))
+            session_state[f"transcription_{transcript:06d}"] = text
+            transcript_ids.append(
+                transcript_store.add(
+                    f"{transcript:064x}", "benchmark", f"Meeting {transcript}.mp4", text
+                )
+            )
+
+        selected = args.transcripts // 2
+        handle = transcript_store.open_transcript(transcript_ids[selected])
+        assert handle.text == session_state[f"transcription_{selected:06d}"]
+
+        results = {
+            "DataFrame scan (old)": time_lookup(
+                lambda: dataframe_lookup(
+                    session_state, f"transcription_{selected:06d}"
+                ),
+                max(args.repeat // 10, 1),
+            ),
+            "catalog by id": time_lookup(
+                lambda: transcript_store.get_text(transcript_ids[selected]),
+                args.repeat,
+            ),
+            # Step 3 checks the metadata of the handle on every rerun, in case the transcription was replaced
+            "memoized handle": time_lookup(
+                lambda: handle.is_current() and handle.text, args.repeat
+            ),
+        }
+
+        print(f"{args.transcripts} transcriptions of {args.words} words")
+        print(f"{'lookup':>22} {'µs per rerun':>14}")
+        for name, microseconds in results.items():
+            print(f"{name:>22} {microseconds:>14.1f}")
+
+
+if __name__ == "__main__":
+    # Run the main function
+    main()
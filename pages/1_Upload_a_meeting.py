@@ -1,9 +1,12 @@
 # Import libraries
 import streamlit as st
-from transformers import pipeline
 import time
-from datetime import datetime
+import uuid
 from streamlit_js_eval import get_page_location
+from utils import config
+from utils import jobs
+from utils import transcript_store
+from utils.upload import remove_spooled_upload, spool_upload
 
 # Set the page configuration
 st.set_page_config(
@@ -102,8 +105,151 @@ def format_time(milliseconds):
         return f"{int(milliseconds/60000)} min"
 
 
+# Define a function to show the progress of a transcription job in its status container
+def show_transcription_job(job, status, col1, col2):
+    # Step 3: Getting a transcription of uploaded meeting
+    with col1:
+        st.write("Getting a transcription of uploaded meeting...")
+        progress_bar = st.progress(
+            0.0, text="Waiting for the transcription to start..."
+        )
+        transcription_container = st.container(height=250)
+    with col2:
+        st.write("&nbsp;")
+
+    return {
+        "job": job,
+        "status": status,
+        "col1": col1,
+        "col2": col2,
+        "progress_bar": progress_bar,
+        "transcription_container": transcription_container,
+        "shown_segments": 0,
+    }
+
+
+# Define a function to update the progress of a transcription job
+def update_transcription_job(followed_job):
+    job = followed_job["job"]
+
+    # Append the text of new segments to the partial transcription
+    new_segments = job.segments[followed_job["shown_segments"] :]
+    followed_job["shown_segments"] += len(new_segments)
+    for segment in new_segments:
+        if segment["text"].strip():
+            with followed_job["transcription_container"]:
+                st.write(segment["text"].strip())
+
+    # Update the progress bar
+    if job.status == jobs.QUEUED:
+        job_manager = jobs.get_job_manager()
+        queue_position = job_manager.queue_position(job.id)
+        average_wait_time = job_manager.stats()["average_wait_s"] * 1000
+        followed_job["progress_bar"].progress(
+            0.0,
+            text=f"Waiting in the queue (position {queue_position}, average wait {format_time(average_wait_time)})...",
+        )
+    else:
+        followed_job["progress_bar"].progress(
+            job.progress, text=f"{int(job.progress * 100)}% transcribed"
+        )
+
+
+# Define a function to show the result of a finished transcription job
+# The job has already stored the transcription in the transcript catalog
+def finish_transcription_job(followed_job):
+    job = followed_job["job"]
+    status = followed_job["status"]
+    col1 = followed_job["col1"]
+    col2 = followed_job["col2"]
+
+    if job.status == jobs.CANCELLED:
+        status.update(
+            label=f"Getting a transcription of {job.name} was stopped",
+            state="error",
+            expanded=False,
+        )
+        return
+
+    if job.status == jobs.FAILED:
+        status.update(
+            label=f"ArcticMeet could not get a transcription of {job.name}",
+            state="error",
+            expanded=True,
+        )
+        with status:
+            st.error(body=str(job.error), icon="❌")
+        return
+
+    transcription = job.result
+
+    step3_time = int((job.finished_at - job.created_at) * 1000)
+    with col1:
+        st.write("Transcription got ✔️")
+    with col2:
+        st.write(format_time(step3_time))
+
+    # If silence was skipped, show how much of the meeting was skipped
+    if job.vad and transcription["duration_s"] > 0:
+        skipped_percent = int(
+            transcription["skipped_s"] / transcription["duration_s"] * 100
+        )
+        with col1:
+            st.write(
+                f"Skipped {format_time(transcription['skipped_s'] * 1000)} of silence ({skipped_percent}% of the meeting) ✔️"
+            )
+        with col2:
+            st.write("&nbsp;")
+
+    # Update the status container after the transcription is obtained
+    # Show how long the meeting waited in the queue and how long it took to transcribe it
+    queued_time = int(((job.started_at or job.created_at) - job.created_at) * 1000)
+    status.update(
+        label=f"ArcticMeet successfully got a transcription of {job.name} (queued {format_time(queued_time)}, total {format_time(step3_time)})",
+        expanded=False,
+    )
+
+
+# Define a function to follow transcription jobs until they're all finished
+# The jobs run in the background, so this only polls their progress and shows the text of every segment as soon as it's transcribed
+# If the user clicks any button in the meantime, Streamlit reruns the page and the jobs keep running
+def follow_transcription_jobs(followed_jobs):
+    while followed_jobs:
+        for followed_job in list(followed_jobs):
+            # Check if the job is finished before reading its segments, so no segment is missed
+            finished = followed_job["job"].finished
+
+            update_transcription_job(followed_job)
+
+            if finished:
+                # The job is finished, so the session doesn't need to follow it anymore
+                st.session_state["transcription_job_ids"] = [
+                    job_id
+                    for job_id in st.session_state["transcription_job_ids"]
+                    if job_id != followed_job["job"].id
+                ]
+                followed_jobs.remove(followed_job)
+                finish_transcription_job(followed_job)
+
+        if followed_jobs:
+            time.sleep(0.5)
+
+
+# Define a function to show how busy the transcriptions are across all users
+def show_transcription_stats():
+    stats = jobs.get_job_manager().stats()
+    st.caption(
+        f"Transcriptions across all users: {stats['running']} of {stats['max_running']} running, "
+        f"{stats['queued']} waiting, average wait {format_time(stats['average_wait_s'] * 1000)}"
+    )
+
+
 # Define the main function
 def main():
+    # Give this session an id, so its transcriptions take turns with the transcriptions of other sessions
+    if "session_id" not in st.session_state:
+        st.session_state["session_id"] = uuid.uuid4().hex
+
     # Add a title
     st.markdown(
         """
@@ -139,11 +285,25 @@ def main():
     # Create the form for the user to upload a meeting
     with st.form(key="upload_form"):
         # File uploader
-        uploaded_meeting = st.file_uploader(
-            label="Upload your meeting to get a transcription of it",
+        uploaded_meetings = st.file_uploader(
+            label="Upload your meetings to get a transcription of each of them",
             type=["mp4"],
-            accept_multiple_files=False,
-            help="You can only upload one meeting at a time. The file must be in mp4 format and not larger than 5GB.",
+            accept_multiple_files=True,
+            help=f"You can upload up to {config.MAX_UPLOAD_FILES} meetings at a time. Each meeting gets its own transcription. The files must be in mp4 format and not larger than {config.MAX_UPLOAD_TOTAL_BYTES // (1024 * 1024)} MB in total.",
+        )
+
+        # Checkbox to skip silence before getting a transcription
+        vad_checkbox = st.checkbox(
+            label="Skip silence",
+            value=config.VAD_ENABLED,
+            help="Detect where people speak and send only these parts of the meeting to Whisper. This makes getting a transcription of meetings with long stretches of silence, hold music or people waiting to join much faster.",
+        )
+
+        # Checkbox to identify speakers after getting a transcription
+        diarization_checkbox = st.checkbox(
+            label="Identify speakers",
+            value=config.DIARIZATION_ENABLED,
+            help="Tell the speakers of the meeting apart by their voices, locally. ArcticMeet then gets the number of participants and how long each of them spoke without sending the whole transcription to Snowflake Arctic.",
         )
 
         # Info message with a link to the sample meeting
@@ -165,17 +325,80 @@ def main():
                 label="Stop getting a transcription", type="primary"
             )
 
-        if start_button and uploaded_meeting is not None:
-            # If the start button is clicked and there is a meeting uploaded, start getting a transcription
-            # Initialize the start time
-            start_time = time.time()
-
-            # Add a status container to show the progress of getting a transcription
-            with st.status(
-                label=f"Getting a transcription of {uploaded_meeting.name}... This could take a while. Please be patient.",
-                expanded=True,
-            ) as status:
+        # Show the queue depth and wait time of the transcriptions
+        show_transcription_stats()
+
+        # Get the transcription jobs this session is following, if any
+        job_manager = jobs.get_job_manager()
+        if "transcription_job_ids" not in st.session_state:
+            st.session_state["transcription_job_ids"] = []
+        running_jobs = [
+            job
+            for job in map(job_manager.get, st.session_state["transcription_job_ids"])
+            if job is not None
+        ]
+        st.session_state["transcription_job_ids"] = [job.id for job in running_jobs]
+
+        # If the stop button is clicked, stop getting transcriptions
+        if stop_button:
+            if running_jobs:
+                # Cancel the jobs, which also frees the CPU they were using
+                for job in running_jobs:
+                    job_manager.cancel(job.id)
+                st.session_state["transcription_job_ids"] = []
+                st.toast(
+                    body=f"Getting a transcription of {', '.join(job.name for job in running_jobs)} was stopped.",
+                    icon="🛑",
+                )
+                running_jobs = []
+            else:
+                # If there is no transcription running, show a toast notification
+                st.toast(
+                    body="Getting a transcription can be stopped only after starting it.",
+                    icon="❌",
+                )
+
+        # Collect the status containers of the jobs to follow
+        followed_jobs = []
+
+        # If the page was rerun while transcriptions are running, keep following them
+        for job in running_jobs:
+            status = st.status(
+                label=f"Getting a transcription of {job.name}... This could take a while. Please be patient.",
+                expanded=len(running_jobs) == 1,
+            )
+            with status:
                 col1, col2 = st.columns([0.9, 0.1])
+            followed_jobs.append(show_transcription_job(job, status, col1, col2))
+
+        # Streamlit holds the uploaded meetings in the server's memory, so a submission can only have a limited number and total size of meetings
+        uploads_too_large = False
+        if start_button and uploaded_meetings:
+            uploads_too_large = (
+                len(uploaded_meetings) > config.MAX_UPLOAD_FILES
+                or sum(uploaded_meeting.size for uploaded_meeting in uploaded_meetings)
+                > config.MAX_UPLOAD_TOTAL_BYTES
+            )
+            if uploads_too_large:
+                # If the meetings are too many or too large, show an error message instead of starting
+                st.error(
+                    body=f"You can upload up to {config.MAX_UPLOAD_FILES} meetings at a time, and they can't be larger than {config.MAX_UPLOAD_TOTAL_BYTES // (1024 * 1024)} MB in total. Please remove some meetings from the uploader.",
+                    icon="❌",
+                )
+
+        if start_button and uploaded_meetings and not uploads_too_large:
+            # If the start button is clicked and there are meetings uploaded, start getting a transcription of each of them
+            for uploaded_meeting in uploaded_meetings:
+                # Initialize the start time
+                start_time = time.time()
+
+                # Add a status container to show the progress of getting a transcription
+                status = st.status(
+                    label=f"Getting a transcription of {uploaded_meeting.name}... This could take a while. Please be patient.",
+                    expanded=len(uploaded_meetings) == 1,
+                )
+                with status:
+                    col1, col2 = st.columns([0.9, 0.1])
 
                 # Step 1: Looking for uploaded meeting
                 with col1:
@@ -183,93 +406,69 @@ def main():
                 with col2:
                     st.write("&nbsp;")
 
-                if uploaded_meeting is not None:  # Check if there is a meeting uploaded
-                    step1_time = int((time.time() - start_time) * 1000)
-                    with col1:
-                        st.write("Meeting found ✔️")
-                    with col2:
-                        st.write(format_time(step1_time))
+                step1_time = int((time.time() - start_time) * 1000)
+                with col1:
+                    st.write("Meeting found ✔️")
+                with col2:
+                    st.write(format_time(step1_time))
 
-                    # Step 2: Reading uploaded meeting
-                    with col1:
-                        st.write("Reading uploaded meeting...")
-                    with col2:
-                        st.write("&nbsp;")
+                # Step 2: Saving uploaded meeting
+                with col1:
+                    st.write("Saving uploaded meeting...")
+                with col2:
+                    st.write("&nbsp;")
 
-                    bytes_data = uploaded_meeting.read()  # Read the uploaded meeting
+                # Until the job is submitted, nothing else removes the spooled meeting, so it's removed here if the page is rerun or stopped or something fails in between
+                meeting_path = None
+                try:
+                    # Spool the uploaded meeting to disk in chunks instead of reading it into memory at once
+                    meeting_path, meeting_hash = spool_upload(uploaded_meeting)
 
                     step2_time = int((time.time() - start_time) * 1000)
                     with col1:
-                        st.write("Meeting read ✔️")
+                        st.write("Meeting saved ✔️")
                     with col2:
                         st.write(format_time(step2_time))
 
-                    # Step 3: Getting a transcription of uploaded meeting
-                    with col1:
-                        st.write("Getting a transcription of uploaded meeting...")
-                    with col2:
-                        st.write("&nbsp;")
-
-                    # Use cache to transcribe the uploaded meeting only once if the user keeps uploading the same meeting
-                    # The transcription will be cached for 1 hour
-                    @st.cache_resource(
-                        ttl=3600,
-                        show_spinner="ArcticMeet is caching the transcription...",
+                    # Queue a background job to transcribe the uploaded meeting, which takes over the spooled meeting
+                    # The jobs of all meetings are transcribed concurrently, up to the configured limit
+                    job = job_manager.submit(
+                        st.session_state["session_id"],
+                        uploaded_meeting.name,
+                        meeting_path,
+                        meeting_hash,
+                        vad=vad_checkbox,
+                        diarize=diarization_checkbox,
                     )
-                    def load_model(transcription):
-                        pipe = pipeline(
-                            "automatic-speech-recognition", "openai/whisper-tiny"
-                        )
+                except BaseException as error:
+                    if meeting_path is not None:
+                        remove_spooled_upload(meeting_path)
 
-                        return pipe(transcription)
-
-                    # Transcribe the uploaded meeting
-                    transcription = load_model(bytes_data)
-
-                    step3_time = int((time.time() - start_time) * 1000)
-                    with col1:
-                        st.write("Transcription got ✔️")
-                    with col2:
-                        st.write(format_time(step3_time))
+                    if not isinstance(error, jobs.TranscriptionQueueFullError):
+                        raise
 
-                    # Update the status container after the transcription is obtained
                     status.update(
-                        label=f"ArcticMeet successfully got a transcription of {uploaded_meeting.name}",
-                        expanded=False,
+                        label=f"ArcticMeet could not get a transcription of {uploaded_meeting.name}",
+                        state="error",
+                        expanded=True,
                     )
+                    with status:
+                        st.error(body=str(error), icon="❌")
+                    continue
 
-                    # Store the transcription to the session state
-                    get_time = datetime.fromtimestamp(time.time()).strftime(
-                        "%Y-%m-%d_%H:%M:%S"
-                    )
-                    if f"transcription_{get_time}" not in st.session_state:
-                        st.session_state[f"transcription_{get_time}"] = transcription[
-                            "text"
-                        ]
+                st.session_state["transcription_job_ids"].append(job.id)
+                followed_jobs.append(show_transcription_job(job, status, col1, col2))
 
-            # If the stop button is clicked, stop getting a transcription
-            if stop_button:
-                st.stop()
+        # Follow all transcription jobs of this session until they're finished
+        follow_transcription_jobs(followed_jobs)
 
-        if start_button and uploaded_meeting is None:
-            # If the start button is clicked and there is no meeting uploaded, show a toast notification
+        if start_button and not uploaded_meetings:
+            # If the start button is clicked and there are no meetings uploaded, show a toast notification
             st.toast(
                 body="There is no meeting uploaded to start getting a transcription. Please upload a meeting.",
                 icon="❌",
             )
 
-        if stop_button and uploaded_meeting is None:
-            # If the stop button is clicked and there is no meeting uploaded, show a toast notification
-            st.toast(
-                body="Getting a transcription can be stopped only after starting it.",
-                icon="❌",
-            )
-
-    # Get keys starting with "transcription_"
-    transcription_keys = [
-        key for key in st.session_state.keys() if key.startswith("transcription_")
-    ]
-
     # Add a CTA button to continue with Step 2
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -284,11 +483,11 @@ def main():
 
     # If the CTA button is clicked
     if cta_button:
-        if transcription_keys:
-            # If there are transcription keys, switch pages
+        if transcript_store.count():
+            # If there are stored transcriptions, switch pages
             st.switch_page("pages/2_Select_a_transcription.py")
         else:
-            # If there are no transcription keys, show a toast notification
+            # If there are no stored transcriptions, show a toast notification
             st.toast(
                 body="There is no meeting uploaded to continue with Step 2. Please upload a meeting.",
                 icon="❌",
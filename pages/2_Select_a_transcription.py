@@ -1,6 +1,14 @@
 # Import libraries
 import streamlit as st
 import pandas as pd
+import io
+import math
+import re
+import time
+from datetime import datetime
+from utils import catalog_transfer
+from utils import config
+from utils import transcript_store
 
 # Set the page configuration
 st.set_page_config(
@@ -72,6 +80,24 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
+# Number of transcriptions listed per page
+PAGE_SIZE = 20
+
+
+# Define a function to escape the characters that Streamlit formats as markdown, LaTeX, colors or emojis
+# The names and the texts of transcriptions are shown as they are, so "$5 or $10" isn't rendered as math and "*" or "#" don't change the layout
+def escape_markdown(text):
+    return re.sub(r"([\\`*_{}\[\]()#+\-.!|<>~$:])", r"\\\1", text)
+
+
+# Define a function to format the snippet of a search result as markdown, with the matches in bold
+def format_snippet(snippet):
+    return (
+        escape_markdown(snippet)
+        .replace(transcript_store.SNIPPET_MATCH_START, "**")
+        .replace(transcript_store.SNIPPET_MATCH_END, "**")
+    )
+
 
 # Define the main function
 def main():
@@ -81,27 +107,78 @@ def main():
         unsafe_allow_html=True,
     )
 
-    # Get keys starting with "transcription_"
-    transcription_keys = [
-        key for key in st.session_state.keys() if key.startswith("transcription_")
-    ]
+    # Get the number of stored transcriptions from the transcript catalog
+    transcript_count = transcript_store.count()
+
+    if transcript_count:
+        # If there are stored transcriptions
+        # Add a search box to find past transcriptions by what was said in the meeting or by the name of the meeting
+        search_query = st.text_input(
+            "Search past transcriptions",
+            placeholder="For example: pricing",
+            help="ArcticMeet searches the names and the texts of all past transcriptions and shows the best matches first.",
+        )
+
+        if search_query.strip():
+            # If the user searched for something, list the best matches, best match first
+            start_time = time.time()
+            transcripts = transcript_store.search(search_query, limit=PAGE_SIZE)
+            search_time = int((time.time() - start_time) * 1000)
+        else:
+            # Otherwise, list one page of past transcriptions, newest first
+            # Only the metadata and a short preview of the transcriptions on the page are loaded, so the page stays fast however many transcriptions there are
+            page_count = math.ceil(transcript_count / PAGE_SIZE)
+            page = st.number_input(
+                f"Page (of {page_count})",
+                min_value=1,
+                max_value=page_count,
+                value=1,
+                step=1,
+            )
+            transcripts = transcript_store.list_transcripts(
+                limit=PAGE_SIZE, offset=(page - 1) * PAGE_SIZE
+            )
+        transcripts = {transcript["id"]: transcript for transcript in transcripts}
+
+        # Keep the selected transcription selected while the user pages or searches
+        selected_transcription = st.session_state.get("selected_transcription")
+        transcription_options = list(transcripts)
+        selected_index = (
+            transcription_options.index(selected_transcription)
+            if selected_transcription in transcripts
+            else None
+        )
 
-    if transcription_keys:
-        # If there are transcription keys in the session state
         # Add a selectbox to select the transcription to be analyzed
         selected_transcription = st.selectbox(
             "Which transcription would you like to analyze?",
-            transcription_keys,
-            index=None,
+            transcription_options,
+            format_func=lambda transcript_id: transcript_store.label(
+                transcripts[transcript_id]
+            ),
+            index=selected_index,
             placeholder="Select a transcription...",
         )
 
         # Store the selected transcription in the session state
-        if "selected_transcription" not in st.session_state:
-            st.session_state["selected_transcription"] = selected_transcription
-        else:
+        if selected_transcription is not None:
             st.session_state["selected_transcription"] = selected_transcription
 
+        # Show the full text of the selected transcription, which is the only one loaded in full
+        selected_transcription = st.session_state.get("selected_transcription")
+        selected_transcript = (
+            transcript_store.get(selected_transcription)
+            if selected_transcription is not None
+            else None
+        )
+        if selected_transcript is not None:
+            with st.expander(
+                f"Selected: {escape_markdown(transcript_store.label(selected_transcript))}"
+            ):
+                st.markdown(
+                    escape_markdown(transcript_store.get_text(selected_transcription))
+                )
+
         # Add a CTA button to continue with Step 3
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -113,8 +190,7 @@ def main():
 
         # If the CTA button is clicked
         if cta_button:
-            selected_transcription = st.session_state.get("selected_transcription")
-            if selected_transcription is not None:
+            if selected_transcript is not None:
                 # If a transcription is selected, go to Step 3
                 st.switch_page("pages/3_Transcription_analysis.py")
             else:
@@ -124,27 +200,50 @@ def main():
                     icon="❌",
                 )
 
-        # Add a header
-        st.markdown("<h3>All past transcriptions</h3>", unsafe_allow_html=True)
+        if search_query.strip():
+            # Add a header
+            st.markdown("<h3>Search results</h3>", unsafe_allow_html=True)
+            st.caption(f"{len(transcripts)} best matches in {search_time} ms")
 
-        # Create an empty DataFrame to store the transcription key-value pairs
-        transcription_data = {"Key": [], "Value": []}
-
-        # Iterate over the keys in the session state
-        for key in st.session_state.keys():
-            # Check if the key starts with "transcription_"
-            if key.startswith("transcription_"):
-                # If a key starts with "transcription_", add the key-value pair to the DataFrame
-                transcription_data["Key"].append(key)
-                transcription_data["Value"].append(st.session_state[key])
+            # Show a snippet of every match with the matching words in bold
+            for transcript in transcripts.values():
+                st.markdown(
+                    f"**{escape_markdown(transcript_store.label(transcript))}**  \n{format_snippet(transcript['snippet'])}"
+                )
+        else:
+            # Add a header
+            st.markdown("<h3>All past transcriptions</h3>", unsafe_allow_html=True)
 
-        # Convert the dictionary to a DataFrame
-        transcription_df = pd.DataFrame(transcription_data)
+            # Create a DataFrame with the metadata and the preview of every transcription on the page
+            transcription_df = pd.DataFrame(
+                {
+                    "Created": [
+                        datetime.fromtimestamp(transcript["created_at"])
+                        for transcript in transcripts.values()
+                    ],
+                    "Meeting": [
+                        transcript["name"] for transcript in transcripts.values()
+                    ],
+                    "Duration (min)": [
+                        (
+                            round(transcript["duration_s"] / 60, 1)
+                            if transcript["duration_s"] is not None
+                            else None
+                        )
+                        for transcript in transcripts.values()
+                    ],
+                    "Preview": [
+                        transcript["preview"] for transcript in transcripts.values()
+                    ],
+                }
+            )
 
-        # Display the DataFrame using st.data_editor()
-        edited_transcription_df = st.data_editor(transcription_df, disabled=True)
+            # Display the DataFrame using st.data_editor()
+            edited_transcription_df = st.data_editor(
+                transcription_df, disabled=True, hide_index=True
+            )
     else:
-        # If there are no transcription keys in the session state
+        # If there are no stored transcriptions
         # Add an error message
         st.error(
             body="No transcriptions are available to select. Please upload a meeting to get a transcription.",
@@ -165,6 +264,47 @@ def main():
         if cta_button:
             st.switch_page("pages/1_Upload_a_meeting.py")
 
+    # Add an expander to export all transcriptions and their analyses, or to import them from another ArcticMeet
+    # It's hidden unless it's enabled, since the export holds the transcriptions of all users and an import replaces them
+    if config.CATALOG_TRANSFER_UI:
+        with st.expander("Export or import transcriptions"):
+            # Export everything at once as Parquet files in a zip archive
+            if st.button("Prepare an export of all transcriptions and analyses"):
+                with st.spinner("Exporting transcriptions and analyses..."):
+                    export_file = io.BytesIO()
+                    transcripts, analyses = catalog_transfer.export_archive(export_file)
+
+                st.download_button(
+                    label=f"Download {transcripts} transcriptions and {analyses} analyses",
+                    data=export_file.getvalue(),
+                    file_name=f"arcticmeet_export_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.zip",
+                    mime="application/zip",
+                )
+
+            # Import an export made by this or another ArcticMeet
+            import_files = st.file_uploader(
+                label="Import transcriptions and analyses",
+                type=["zip", "parquet"],
+                accept_multiple_files=True,
+                help="Upload a zip archive exported above, or its transcripts.parquet and analyses.parquet files. Transcriptions that are already stored are replaced.",
+            )
+            if st.button("Import", disabled=not import_files):
+                try:
+                    with st.spinner("Importing transcriptions and analyses..."):
+                        transcripts, analyses = catalog_transfer.import_exports(
+                            import_files
+                        )
+                except Exception as error:
+                    st.error(
+                        body=f"ArcticMeet could not import the files: {error}",
+                        icon="❌",
+                    )
+                else:
+                    st.success(
+                        body=f"Imported {transcripts} transcriptions and {analyses} analyses. They're listed the next time the page is refreshed.",
+                        icon="✅",
+                    )
+
 
 if __name__ == "__main__":
     # Run the main function
@@ -1,11 +1,19 @@
 # Import libraries
 import streamlit as st
-from snowflake.snowpark import Session
-from snowflake.cortex import Summarize, Complete, Sentiment, Translate
 import pandas as pd
+import html
+import itertools
 import json
 import re
-import plotly.express as px
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils import config
+from utils import transcript_store
+from utils.compressed_text import decoded_cache_usage
+from utils.diarization import speaker_talk_times
+from utils.memory import deep_sizeof
+from utils.scheduler import get_cortex_scheduler
+from utils.snowflake_sessions import get_session_pool
 
 # Set the page configuration
 st.set_page_config(
@@ -78,17 +86,6 @@ if not connection_params["password"]:
         unsafe_allow_html=True,
     )
 
-# Initialize session variable to None, so in case at least one secret is not set, the finally block will not throw an error "NameError: name 'session' is not defined"
-session = None
-
-# Create Snowflake session
-if (
-    connection_params["account"]
-    and connection_params["user"]
-    and connection_params["password"]
-):
-    session = Session.builder.configs(connection_params).create()
-
 # Add a sidebar
 with st.sidebar:
     # Add a copyright and social media links
@@ -162,115 +159,459 @@ st.markdown(
 )
 
 
-# Define a function to get the selected transcription value from the session state
-def get_transcription_value(selected_transcription_key):
-    # Prepare the selected transcription value for analysis
-    # Create an empty DataFrame to store the transcription key-value pairs
-    transcription_data = {"Key": [], "Value": []}
+# Define a function to get a handle to the selected transcription, or None if it doesn't exist (anymore)
+# The handle is kept in the session state, so reruns of the page read the transcription from memory instead of loading it again
+# The handle is opened again if the transcription was replaced since, like when the meeting was transcribed again
+def get_selected_transcript(selected_transcript_id):
+    if selected_transcript_id is None:
+        return None
 
-    # Iterate over the keys in the session state
-    for key in st.session_state.keys():
-        # Check if the key starts with "transcription_"
-        if key.startswith("transcription_"):
-            # If a key starts with "transcription_", add the key-value pair to the DataFrame
-            transcription_data["Key"].append(key)
-            transcription_data["Value"].append(st.session_state[key])
+    selected_transcript = st.session_state.get("selected_transcript")
+    if (
+        selected_transcript is None
+        or selected_transcript.id != selected_transcript_id
+        or not selected_transcript.is_current()
+    ):
+        selected_transcript = transcript_store.open_transcript(selected_transcript_id)
+        st.session_state["selected_transcript"] = selected_transcript
 
-    # Convert the dictionary to a DataFrame
-    transcription_df = pd.DataFrame(transcription_data)
+    return selected_transcript
 
-    # Find the index of the row where the Key matches selected_transcription_key
-    index = transcription_df.index[
-        transcription_df["Key"] == selected_transcription_key
-    ].tolist()
 
-    # If there's a match
-    if index:
-        # Save the selected transcription value for analysis
-        selected_transcription_value = transcription_df.loc[index[0], "Value"]
+# Define a function to get the participants of the selected transcription from its speakers identified in Step 1
+# Returns the number of speakers and the talk time of every speaker, or None if speakers weren't identified
+def get_speaker_stats(selected_transcript):
+    timestamps = selected_transcript.timestamps
+    if not timestamps or timestamps.get("speakers") is None:
+        return None
 
-    return selected_transcription_value
+    return speaker_talk_times(timestamps["segments"], timestamps["speakers"])
 
 
-# Use cache to analyze the transcription only once if the user keeps uploading the same meeting
-# The transcription analysis will be cached for 1 hour
-@st.cache_data(
-    ttl=3600,
-    show_spinner="ArcticMeet is caching the transcription analysis...",
-)
-# Define a function to analyze the selected transcription
-def analyze_transcription(
-    selected_transcription_value,
+# Define a function to call a Snowflake Cortex LLM function once it's the turn of this session
+# Only a bounded number of Cortex calls run at the same time across all sessions, and the sessions take turns
+# The call runs on a Snowflake session from the pool shared across reruns and sessions, so it doesn't wait for Snowpark to connect every time
+# The session is taken before the turn, so a call that waits for a free session doesn't hold a turn other sessions could use
+def call_cortex(session_id, cortex_function, **kwargs):
+    with get_session_pool().session(connection_params) as session:
+        with get_cortex_scheduler().slot(session_id):
+            return cortex_function(session=session, **kwargs)
+
+
+# Define a function to calculate the sentiment of every sentence with the Sentiment() Snowflake Cortex LLM function
+# The sentences are uploaded once and scored by a single query, so the sentiment of a meeting takes one round trip to Snowflake however long the meeting is
+def score_sentences(sentences, session):
+    # Import the Snowpark functions only when the sentiment is calculated
+    from snowflake.snowpark.functions import call_function, col
+
+    # Skip the round trip to Snowflake if there is nothing to score, like for an empty transcription
+    if not sentences:
+        return []
+
+    sentences_df = session.create_dataframe(
+        [[index, sentence] for index, sentence in enumerate(sentences)],
+        schema=["IDX", "SENTENCE"],
+    )
+    rows = (
+        sentences_df.select(
+            col("IDX"),
+            call_function("SNOWFLAKE.CORTEX.SENTIMENT", col("SENTENCE")).alias(
+                "SENTIMENT"
+            ),
+        )
+        .sort(col("IDX"))
+        .collect()
+    )
+
+    return [row["SENTIMENT"] for row in rows]
+
+
+# Define a function to show how busy Snowflake Cortex is across all users
+def show_cortex_stats():
+    stats = get_cortex_scheduler().stats()
+    st.caption(
+        f"Snowflake Cortex calls across all users: {stats['running']} of {stats['max_running']} running, "
+        f"{stats['queued']} waiting, average wait {stats['average_wait_s']:.1f} s"
+    )
+
+
+# Define a function to show how much memory this session and the decompressed transcriptions shared by all sessions take on the server
+def show_memory_usage():
+    session_bytes = sum(deep_sizeof(value) for value in st.session_state.values())
+    cached_blocks, cached_bytes = decoded_cache_usage()
+
+    memory_usage = f"Memory of this session: {session_bytes / 1024:.0f} KB"
+    selected_transcript = st.session_state.get("selected_transcript")
+    if (
+        selected_transcript is not None
+        and selected_transcript.compressed_text is not None
+    ):
+        compressed_text = selected_transcript.compressed_text
+        memory_usage += f" (selected transcription: {compressed_text.nbytes / 1024:.0f} KB compressed, {len(compressed_text) / 1024:.0f} K characters)"
+    memory_usage += f". Decompressed transcriptions shared by all sessions: {cached_bytes / 1024:.0f} KB in {cached_blocks} blocks."
+
+    with st.sidebar:
+        st.caption(memory_usage)
+
+
+# Snowflake Cortex LLM calls of every analysis feature
+# The summary feature needs two calls, one for the summary and one for the keywords
+ANALYSIS_FEATURE_TASKS = {
+    "summary": ["summary", "keywords"],
+    "agenda": ["agenda"],
+    "participants": ["participants"],
+    "sentiment": ["sentiment"],
+    "translation": ["translation"],
+}
+
+# Tab that shows the result of every Snowflake Cortex LLM call
+ANALYSIS_TASK_TABS = {
+    "summary": "Summary",
+    "keywords": "Summary",
+    "agenda": "Agenda",
+    "participants": "Participants",
+    "sentiment": "Sentiment",
+    "translation": "Translation",
+}
+
+# Tabs of the analysis, in the order they're shown
+ANALYSIS_TABS = ["Summary", "Agenda", "Participants", "Sentiment", "Translation"]
+
+
+# Define a function to get the Snowflake Cortex LLM calls of the selected analysis features
+def get_analysis_tasks(
     summary_checkbox,
     agenda_checkbox,
     participants_checkbox,
     sentiment_checkbox,
     translation_checkbox,
+):
+    selected_features = {
+        "summary": summary_checkbox,
+        "agenda": agenda_checkbox,
+        "participants": participants_checkbox,
+        "sentiment": sentiment_checkbox,
+        "translation": translation_checkbox,
+    }
+
+    return [
+        task
+        for feature, selected in selected_features.items()
+        if selected
+        for task in ANALYSIS_FEATURE_TASKS[feature]
+    ]
+
+
+# Define a function to make one Snowflake Cortex LLM call of the transcription analysis
+# The results are stored in the transcript catalog, so the same call is only made again if the user asks for it
+def run_analysis_task(
+    task,
+    selected_transcription_value,
     selected_from_language,
     selected_to_language,
+    session_id,
 ):
-    # Initialize variables to store analysis results
-    summary = None
-    keywords = None
-    agenda = None
-    participants = None
-    sentiment_df = pd.DataFrame()
-    translation = None
-
-    # If the summary checkbox is checked
-    if summary_checkbox:
-        summary = Summarize(text=selected_transcription_value, session=session)
-
-        keywords = Complete(
+    # Import the Snowflake Cortex LLM functions only when a transcription is analyzed
+    from snowflake.cortex import Complete, Summarize, Translate
+
+    if task == "summary":
+        return call_cortex(session_id, Summarize, text=selected_transcription_value)
+
+    if task == "keywords":
+        return call_cortex(
+            session_id,
+            Complete,
             model="snowflake-arctic",
             prompt=f'Provide up to five keywords from the following text in a JSON object containing a list of keywords: {selected_transcription_value}. Your response should be in JSON format, not in a list or any other format. Here you have an example of the response: {{"keywords": ["keyword1","keyword2","keyword3","keyword4","keyword5"]}}',
-            session=session,
         )
 
-    # If the agenda checkbox is checked
-    if agenda_checkbox:
-        agenda = Complete(
+    if task == "agenda":
+        return call_cortex(
+            session_id,
+            Complete,
             model="snowflake-arctic",
             prompt=f"Provide a concise agenda with topics discussed in the following text: {selected_transcription_value}. Your response should be a numbered list. Here you have an example of the response: 1. Topic 1\n2. Topic 2\n3. Topic 3\n4. Topic 4\n5. Topic 5",
-            session=session,
         )
 
-    # If the participants checkbox is checked
-    if participants_checkbox:
-        participants = Complete(
+    if task == "participants":
+        return call_cortex(
+            session_id,
+            Complete,
             model="snowflake-arctic",
             prompt=f'If you can extract names, provide all participant names and their sex from the following text in a JSON object: {selected_transcription_value}. Your response should be in JSON format, not in a list or any other format. Here is an example of the response if you can extract names: {{"participants_names": [{{"name": "John", "sex": "male"}}, {{"name": "Jane", "sex": "female"}}, {{"name": "Bob", "sex": "male"}}, {{"name": "Alice", "sex": "female"}}]}}. If you cannot extract names, provide a number of participants from the following text in a JSON object: {selected_transcription_value}. Your response should be in JSON format, not in a list or any other format. Here is an example of the response if you cannot extract names: {{"participants_number": 4}}. If you cannot extract participant names or the number of participants, provide the following JSON object: {{"participants_fail": "ArcticMeet could not extract participants."}}',
-            session=session,
         )
 
-    # If the sentiment checkbox is checked
-    if sentiment_checkbox:
+    if task == "sentiment":
         sentences = re.split(
             r"(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?)\s", selected_transcription_value
         )
 
-        # Create a list to store sentiment data
-        sentiment_data = []
+        # Drop empty sentences, since Snowflake Cortex can't score them and returns NULL for them
+        sentences = [sentence for sentence in sentences if sentence.strip()]
 
-        # Iterate over each sentence and calculate sentiment
-        for sentence in sentences:
-            sentiment = Sentiment(text=sentence, session=session)
-            # Append the sentiment data to the list
-            sentiment_data.append({"Sentence": sentence, "Sentiment": sentiment})
+        # Calculate the sentiment of all sentences at once
+        sentiments = call_cortex(session_id, score_sentences, sentences=sentences)
 
-        # Convert the list of dictionaries into a DataFrame
-        sentiment_df = pd.DataFrame(sentiment_data)
+        # Convert the sentences and their sentiment into a DataFrame
+        return pd.DataFrame({"Sentence": sentences, "Sentiment": sentiments})
 
-    # If the translation checkbox is checked
-    if translation_checkbox:
-        translation = Translate(
+    if task == "translation":
+        return call_cortex(
+            session_id,
+            Translate,
             text=selected_transcription_value,
             from_language=selected_from_language,
             to_language=selected_to_language,
-            session=session,
         )
 
-    return summary, keywords, agenda, participants, sentiment_df, translation
+    raise ValueError(f"Unknown analysis task: {task}")
+
+
+# Define a function to get the results of the given Snowflake Cortex LLM calls stored from an earlier analysis of the transcription
+# A translation is only reused if it was made from and to the same languages
+def get_saved_analysis_results(
+    transcript_id, tasks, selected_from_language, selected_to_language
+):
+    analysis = transcript_store.get_analysis(transcript_id)
+    if analysis is None:
+        return {}
+
+    saved_results = {}
+    for task in tasks:
+        if analysis[task] is None:
+            continue
+
+        if task == "translation" and (
+            analysis["translation_from"] != selected_from_language
+            or analysis["translation_to"] != selected_to_language
+        ):
+            continue
+
+        if task == "sentiment":
+            saved_results[task] = pd.DataFrame(
+                {
+                    "Sentence": [item["sentence"] for item in analysis["sentiment"]],
+                    "Sentiment": [item["sentiment"] for item in analysis["sentiment"]],
+                }
+            )
+        else:
+            saved_results[task] = analysis[task]
+
+    return saved_results
+
+
+# Define a function to make the Snowflake Cortex LLM calls of the transcription analysis at the same time
+# Yields the name, the result and the error (or None) of every call as soon as it's done, so the analysis takes about as long as its slowest call instead of the sum of all calls
+# A failed call doesn't stop the other calls, so the other analysis features are still shown
+def iter_analysis_results(
+    tasks,
+    selected_transcription_value,
+    selected_from_language,
+    selected_to_language,
+    session_id,
+):
+    if not tasks:
+        return
+
+    # Define a function to make one call on a worker thread
+    def run_task(task):
+        return run_analysis_task(
+            task,
+            selected_transcription_value,
+            selected_from_language,
+            selected_to_language,
+            session_id,
+        )
+
+    # Every call waits for its turn in the Snowflake Cortex scheduler and runs on its own Snowflake session from the pool
+    # A session never gets more turns at once than the scheduler has, so the other calls wait in the executor, where they can still be dropped
+    executor = ThreadPoolExecutor(
+        max_workers=min(len(tasks), config.MAX_RUNNING_CORTEX_CALLS),
+        thread_name_prefix="arcticmeet-analysis",
+    )
+    try:
+        futures = {executor.submit(run_task, task): task for task in tasks}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as error:
+                yield futures[future], None, error
+            else:
+                yield futures[future], result, None
+    finally:
+        # If the analysis is stopped or the page is rerun, drop the calls that haven't started and don't wait for the running ones
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Define a function to show the summary and the keywords of the meeting
+def show_summary(summary, keywords):
+    if not (summary and keywords):
+        st.error(body="ArcticMeet could not summarize the meeting.", icon="❌")
+        return
+
+    st.subheader("Summary of the meeting")
+    st.write(summary)
+
+    # Keywords
+    # Parse the JSON string into a dictionary
+    keywords_dict = json.loads(keywords)
+
+    # Access the "keywords" key in the dictionary
+    get_keywords = keywords_dict["keywords"]
+
+    # Wrap each keyword with a <span> element
+    keyword_spans = [
+        f"<span>:blue-background[{keyword}]</span>" for keyword in get_keywords
+    ]
+
+    # Concatenate the <span> elements together
+    keyword_string_with_spans = " ".join(keyword_spans)
+
+    # Display the keywords with <span> elements
+    st.markdown(
+        f"Keywords: {keyword_string_with_spans}",
+        unsafe_allow_html=True,
+    )
+
+
+# Define a function to show the agenda of the meeting
+def show_agenda(agenda):
+    st.subheader("Agenda of the meeting")
+    st.write(agenda)
+
+
+# Define a function to show the participants of the meeting
+# The participants are either the speakers identified in Step 1 or the participants extracted by Snowflake Arctic
+def show_participants(participants, speaker_stats):
+    # Import Plotly only when there are participants to chart
+    import plotly.express as px
+
+    st.subheader("Participants of the meeting")
+
+    # If speakers were identified in Step 1, show the number of speakers and how long each of them spoke
+    if speaker_stats is not None:
+        speaker_count, talk_times = speaker_stats
+
+        st.write(
+            f"There were :blue-background[{speaker_count}] participants in the meeting."
+        )
+
+        st.subheader("Talk time of the participants")
+
+        # Create a Plotly bar chart with the talk time of every speaker in minutes
+        fig = px.bar(
+            x=[f"Speaker {speaker + 1}" for speaker in range(len(talk_times))],
+            y=talk_times / 60,
+            labels={"x": "Participant", "y": "Talk time (min)"},
+        )
+
+        # Display the bar chart
+        st.plotly_chart(fig, use_container_width=True)
+
+        # Add an info message
+        st.info(
+            body="Participants were identified locally by their voices when the meeting was transcribed. Participants who didn't speak are not counted.",
+            icon="ℹ️",
+        )
+    else:
+        participants_dict = json.loads(participants)
+
+        get_key = list(participants_dict.keys())[0]
+
+        # Lists to store image URLs, captions and genders
+        images = []
+        captions = []
+        genders = []
+
+        # If Snowflake Arctic was able to extract names and sexes
+        if get_key == "participants_names":
+            get_participants = participants_dict[get_key]
+
+            for participant in get_participants:
+                name = participant["name"]
+                sex = participant["sex"]
+
+                # Determine the image URL based on the participant's sex
+                image_url = "images/girl.png" if sex == "female" else "images/boy.png"
+
+                # Append the image URL to the list
+                images.append(image_url)
+
+                # Append the participant's name as caption
+                captions.append(name)
+
+                # Append the gender to the list
+                genders.append(sex)
+
+            # Display the images
+            st.image(images, width=75, caption=captions)
+
+            st.subheader("Distribution of male vs female participants")
+
+            # Count the occurrences of each gender
+            gender_counts = pd.Series(genders).value_counts()
+
+            # Create a Plotly pie chart
+            fig = px.pie(
+                values=gender_counts.values,  # Gender counts
+                names=gender_counts.index,  # Gender labels (male/female)
+            )
+
+            # Display the bar chart
+            st.plotly_chart(fig, use_container_width=True)
+
+            # Add an info message
+            st.info(
+                body="This analysis feature is the least reliable because it depends on names being mentioned in the meeting at any point. It might happen that ArcticMeet doesn't find all participants but only some of them.",
+                icon="ℹ️",
+            )
+
+        # If Snowflake Arctic was not able to extract names and sexes, but was able to extract the number of participants
+        if get_key == "participants_number":
+            get_participants = participants_dict[get_key]
+
+            st.write(
+                f"There were :blue-background[{get_participants}] participants in the meeting."
+            )
+
+            # Add an info message
+            st.info(
+                body="This analysis feature is the least reliable because it depends on the number of participants being mentioned in the meeting at any point. It might happen that ArcticMeet doesn't find all participants but only some of them.",
+                icon="ℹ️",
+            )
+
+        # If Snowflake Arctic was not able to extract names and sexes, and was not able to extract the number of participants
+        if get_key == "participants_fail":
+            get_participants = participants_dict[get_key]
+
+            st.error(
+                body=get_participants,
+                icon="❌",
+            )
+
+
+# Define a function to show the sentiment of every sentence of the meeting
+def show_sentiment(sentiment_df):
+    st.subheader("Sentiment of the meeting")
+    st.line_chart(sentiment_df["Sentiment"])
+    st.data_editor(sentiment_df, disabled=True)
+
+
+# Define a function to show the translation of the meeting
+def show_translation(translation):
+    st.subheader("Translation of the meeting")
+    st.write(translation)
+
+    # Add an info message
+    st.info(
+        body="""
+            If the translation is cut off, it's because the transcription is too long and hits the context limit of the Translate() Snowflake Cortex LLM function. There are two possible solutions:
+
+            1. The Translate() Snowflake Cortex LLM function gets an update with a larger context limit.
+            2. I change the code so that the transcription is sent to the Translate() Snowflake Cortex LLM function in chunks, but to do this, I need to know which tokenizer Snowflake Arctic uses. I couldn't find this information anywhere.
+        """,
+        icon="ℹ️",
+    )
 
 
 # Languages that are supported for the Translate function
@@ -291,292 +632,272 @@ languages_supported = [
 
 # Define the main function
 def main():
-    # Initialize analysis_result variable to None
-    analysis_result = None
+    # Initialize analysis_tasks and speaker_stats variables to None
+    analysis_tasks = None
+    speaker_stats = None
 
-    try:
-        # Add a title
-        st.markdown(
-            "<h2 style='text-align: center; margin-bottom: 0.5rem;'>❄️ Step 3: Transcription analysis ❄️</h2>",
-            unsafe_allow_html=True,
-        )
+    # Give this session an id, so its Snowflake Cortex calls take turns with the calls of other sessions
+    if "session_id" not in st.session_state:
+        st.session_state["session_id"] = uuid.uuid4().hex
 
-        # Get keys starting with "transcription_"
-        transcription_keys = [
-            key for key in st.session_state.keys() if key.startswith("transcription_")
-        ]
+    # Add a title
+    st.markdown(
+        "<h2 style='text-align: center; margin-bottom: 0.5rem;'>❄️ Step 3: Transcription analysis ❄️</h2>",
+        unsafe_allow_html=True,
+    )
+
+    if transcript_store.count():
+        # If there are stored transcriptions
+        if "selected_transcription" in st.session_state:
+            # If the user has selected a transcription to analyze
+            # Get the id of the selected transcription from the session state and a handle to it
+            selected_transcript = get_selected_transcript(
+                st.session_state["selected_transcription"]
+            )
 
-        if transcription_keys:
-            # If there are transcription keys in the session state
-            if "selected_transcription" in st.session_state:
-                # If the user has selected a transcription to analyze
-                # Get the selected transcription from the session state
-                selected_transcription_key = st.session_state["selected_transcription"]
-
-                if selected_transcription_key is not None:
-                    # Add a text box to display the selected transcription
-                    st.markdown(
-                        f"""
-                            <div style='text-align:center;'>You selected the following transcription to analyze:</div>
-                            <div class='selected-transcription' style='text-align:center; margin-bottom: 1rem;'>{selected_transcription_key}</div>
-                        """,
-                        unsafe_allow_html=True,
+            if selected_transcript is not None:
+                # Add a text box to display the selected transcription
+                # The label contains the name of the uploaded file, so it's escaped before it's put into HTML
+                st.markdown(
+                    f"""
+                        <div style='text-align:center;'>You selected the following transcription to analyze:</div>
+                        <div class='selected-transcription' style='text-align:center; margin-bottom: 1rem;'>{html.escape(selected_transcript.label)}</div>
+                    """,
+                    unsafe_allow_html=True,
+                )
+
+                # Add a CTA button to go back to Step 2
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.write("&nbsp;")
+                with col2:
+                    cta_button = st.button(
+                        "Change the transcription", use_container_width=True
                     )
+                with col3:
+                    st.write("&nbsp;")
 
-                    # Add a CTA button to go back to Step 2
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.write("&nbsp;")
-                    with col2:
-                        cta_button = st.button(
-                            "Change the transcription", use_container_width=True
-                        )
-                    with col3:
-                        st.write("&nbsp;")
-
-                    # If the CTA button is clicked, switch pages
-                    if cta_button:
-                        st.switch_page("pages/2_Select_a_transcription.py")
-
-                    # If Snowflake credentials are not provided
-                    if (
-                        not connection_params["account"]
-                        or not connection_params["user"]
-                        or not connection_params["password"]
-                    ):
-                        # Add an error message
-                        st.error(
-                            body="Please provide your Snowflake credentials in the sidebar. For every credential you provide, you'll need to press Enter to apply. After all your credentials are provided, the app will automatically refresh, and you'll be able to analyze your transcription.",
-                            icon="❗",
+                # If the CTA button is clicked, switch pages
+                if cta_button:
+                    st.switch_page("pages/2_Select_a_transcription.py")
+
+                # If Snowflake credentials are not provided
+                if (
+                    not connection_params["account"]
+                    or not connection_params["user"]
+                    or not connection_params["password"]
+                ):
+                    # Add an error message
+                    st.error(
+                        body="Please provide your Snowflake credentials in the sidebar. For every credential you provide, you'll need to press Enter to apply. After all your credentials are provided, the app will automatically refresh, and you'll be able to analyze your transcription.",
+                        icon="❗",
+                    )
+                else:
+                    # Create the form for the user to select analysis features
+                    with st.form(key="analysis_form"):
+                        # Add a text box to let know the user which analysis features are available
+                        st.write(
+                            "Please select the analysis features you would like to include:"
                         )
-                    else:
-                        # Create the form for the user to select analysis features
-                        with st.form(key="analysis_form"):
-                            # Add a text box to let know the user which analysis features are available
-                            st.write(
-                                "Please select the analysis features you would like to include:"
-                            )
 
-                            # Add checkboxes to select the analysis features
-                            col1, col2, col3, col4, col5 = st.columns(5)
-                            with col1:
-                                summary_checkbox = st.checkbox(
-                                    "Summary",
-                                    key="summary_checkbox",
-                                )
-                            with col2:
-                                agenda_checkbox = st.checkbox(
-                                    "Agenda",
-                                    key="agenda_checkbox",
-                                )
-                            with col3:
-                                participants_checkbox = st.checkbox(
-                                    "Participants",
-                                    key="participants_checkbox",
-                                )
-                            with col4:
-                                sentiment_checkbox = st.checkbox(
-                                    "Sentiment",
-                                    key="sentiment_checkbox",
-                                )
-                            with col5:
-                                translation_checkbox = st.checkbox(
-                                    "Translation",
-                                    key="translation_checkbox",
-                                )
+                        # Add checkboxes to select the analysis features
+                        col1, col2, col3, col4, col5 = st.columns(5)
+                        with col1:
+                            summary_checkbox = st.checkbox(
+                                "Summary",
+                                key="summary_checkbox",
+                            )
+                        with col2:
+                            agenda_checkbox = st.checkbox(
+                                "Agenda",
+                                key="agenda_checkbox",
+                            )
+                        with col3:
+                            participants_checkbox = st.checkbox(
+                                "Participants",
+                                key="participants_checkbox",
+                            )
+                        with col4:
+                            sentiment_checkbox = st.checkbox(
+                                "Sentiment",
+                                key="sentiment_checkbox",
+                            )
+                        with col5:
+                            translation_checkbox = st.checkbox(
+                                "Translation",
+                                key="translation_checkbox",
+                            )
 
-                            # Add a selectbox to select the language to translate from and to
-                            col_left, col_right = st.columns(2)
-                            with col_left:
-                                selected_from_language = st.selectbox(
-                                    "Which language would you like to translate from?:red[*]",
-                                    languages_supported,
-                                    index=None,
-                                    placeholder="Select a language...",
-                                )
-                                st.write(
-                                    ":red[* This needs to be the language of the meeting.]"
-                                )
-                            with col_right:
-                                selected_to_language = st.selectbox(
-                                    "Which language would you like to translate to?",
-                                    languages_supported,
-                                    index=None,
-                                    placeholder="Select a language...",
-                                )
+                        # Add a selectbox to select the language to translate from and to
+                        col_left, col_right = st.columns(2)
+                        with col_left:
+                            selected_from_language = st.selectbox(
+                                "Which language would you like to translate from?:red[*]",
+                                languages_supported,
+                                index=None,
+                                placeholder="Select a language...",
+                            )
+                            st.write(
+                                ":red[* This needs to be the language of the meeting.]"
+                            )
+                        with col_right:
+                            selected_to_language = st.selectbox(
+                                "Which language would you like to translate to?",
+                                languages_supported,
+                                index=None,
+                                placeholder="Select a language...",
+                            )
 
-                            if selected_from_language == "English":
-                                selected_from_language = "en"
-                            elif selected_from_language == "French":
-                                selected_from_language = "fr"
-                            elif selected_from_language == "German":
-                                selected_from_language = "de"
-                            elif selected_from_language == "Italian":
-                                selected_from_language = "it"
-                            elif selected_from_language == "Japanese":
-                                selected_from_language = "ja"
-                            elif selected_from_language == "Korean":
-                                selected_from_language = "ko"
-                            elif selected_from_language == "Polish":
-                                selected_from_language = "pl"
-                            elif selected_from_language == "Portuguese":
-                                selected_from_language = "pt"
-                            elif selected_from_language == "Russian":
-                                selected_from_language = "ru"
-                            elif selected_from_language == "Spanish":
-                                selected_from_language = "es"
-                            elif selected_from_language == "Swedish":
-                                selected_from_language = "sv"
-
-                            if selected_to_language == "English":
-                                selected_to_language = "en"
-                            elif selected_to_language == "French":
-                                selected_to_language = "fr"
-                            elif selected_to_language == "German":
-                                selected_to_language = "de"
-                            elif selected_to_language == "Italian":
-                                selected_to_language = "it"
-                            elif selected_to_language == "Japanese":
-                                selected_to_language = "ja"
-                            elif selected_to_language == "Korean":
-                                selected_to_language = "ko"
-                            elif selected_to_language == "Polish":
-                                selected_to_language = "pl"
-                            elif selected_to_language == "Portuguese":
-                                selected_to_language = "pt"
-                            elif selected_to_language == "Russian":
-                                selected_to_language = "ru"
-                            elif selected_to_language == "Spanish":
-                                selected_to_language = "es"
-                            elif selected_to_language == "Swedish":
-                                selected_to_language = "sv"
-
-                            # Buttons to start and stop the transcription analysis
-                            col_start, col_stop = st.columns(2)
-                            with col_start:
-                                start_button = st.form_submit_button(
-                                    "Start transcription analysis",
-                                    use_container_width=True,
-                                    type="secondary",
-                                )
-                            with col_stop:
-                                stop_button = st.form_submit_button(
-                                    "Stop transcription analysis",
-                                    use_container_width=True,
-                                    type="primary",
-                                )
+                        if selected_from_language == "English":
+                            selected_from_language = "en"
+                        elif selected_from_language == "French":
+                            selected_from_language = "fr"
+                        elif selected_from_language == "German":
+                            selected_from_language = "de"
+                        elif selected_from_language == "Italian":
+                            selected_from_language = "it"
+                        elif selected_from_language == "Japanese":
+                            selected_from_language = "ja"
+                        elif selected_from_language == "Korean":
+                            selected_from_language = "ko"
+                        elif selected_from_language == "Polish":
+                            selected_from_language = "pl"
+                        elif selected_from_language == "Portuguese":
+                            selected_from_language = "pt"
+                        elif selected_from_language == "Russian":
+                            selected_from_language = "ru"
+                        elif selected_from_language == "Spanish":
+                            selected_from_language = "es"
+                        elif selected_from_language == "Swedish":
+                            selected_from_language = "sv"
+
+                        if selected_to_language == "English":
+                            selected_to_language = "en"
+                        elif selected_to_language == "French":
+                            selected_to_language = "fr"
+                        elif selected_to_language == "German":
+                            selected_to_language = "de"
+                        elif selected_to_language == "Italian":
+                            selected_to_language = "it"
+                        elif selected_to_language == "Japanese":
+                            selected_to_language = "ja"
+                        elif selected_to_language == "Korean":
+                            selected_to_language = "ko"
+                        elif selected_to_language == "Polish":
+                            selected_to_language = "pl"
+                        elif selected_to_language == "Portuguese":
+                            selected_to_language = "pt"
+                        elif selected_to_language == "Russian":
+                            selected_to_language = "ru"
+                        elif selected_to_language == "Spanish":
+                            selected_to_language = "es"
+                        elif selected_to_language == "Swedish":
+                            selected_to_language = "sv"
+
+                        # Checkbox to call Snowflake Cortex again instead of showing the stored results of an earlier analysis
+                        analyze_again_checkbox = st.checkbox(
+                            "Analyze again",
+                            key="analyze_again_checkbox",
+                            help="ArcticMeet stores the results of every analysis and shows them when the same features are selected again. Check this to call Snowflake Cortex again for the selected features and replace their stored results, for example if a translation was cut off.",
+                        )
 
-                            # Run the get_transcription_value function
-                            selected_transcription_value = get_transcription_value(
-                                selected_transcription_key
+                        # Buttons to start and stop the transcription analysis
+                        col_start, col_stop = st.columns(2)
+                        with col_start:
+                            start_button = st.form_submit_button(
+                                "Start transcription analysis",
+                                use_container_width=True,
+                                type="secondary",
+                            )
+                        with col_stop:
+                            stop_button = st.form_submit_button(
+                                "Stop transcription analysis",
+                                use_container_width=True,
+                                type="primary",
                             )
 
-                            # If at least one checkbox is checked
-                            if (
-                                summary_checkbox
-                                or agenda_checkbox
-                                or participants_checkbox
-                                or sentiment_checkbox
-                                or translation_checkbox
-                            ):
-                                # If the start button is clicked
-                                if start_button:
-                                    # If the user has also selected the translation checkbox among other checkboxes
-                                    if translation_checkbox:
-                                        # If the user has selected a language to translate from and to, start analyzing the transcription
-                                        if (
-                                            selected_from_language
-                                            and selected_to_language is not None
-                                        ):
-                                            # Show a spinner while analyzing the transcription
-                                            with st.spinner(
-                                                "Analyzing the transcription..."
-                                            ):
-                                                # Run the analyze_transcription function
-                                                analysis_result = analyze_transcription(
-                                                    selected_transcription_value,
-                                                    summary_checkbox,
-                                                    agenda_checkbox,
-                                                    participants_checkbox,
-                                                    sentiment_checkbox,
-                                                    translation_checkbox,
-                                                    selected_from_language,
-                                                    selected_to_language,
-                                                )
-                                        # If the user has not selected a language to translate from and to, show a toast notification
-                                        else:
-                                            st.toast(
-                                                body="Please select a language to translate from and to.",
-                                                icon="❌",
-                                            )
-                                    # If the user has not selected the translation checkbox but any other checkbox is checked, start analyzing the transcription
+                        # Show the queue depth and wait time of the Snowflake Cortex calls
+                        show_cortex_stats()
+
+                        # Get the text of the selected transcription from its handle
+                        selected_transcription_value = selected_transcript.text
+
+                        # If speakers were identified in Step 1, get the participants locally instead of asking Snowflake Arctic
+                        if participants_checkbox:
+                            speaker_stats = get_speaker_stats(selected_transcript)
+
+                        # If at least one checkbox is checked
+                        if (
+                            summary_checkbox
+                            or agenda_checkbox
+                            or participants_checkbox
+                            or sentiment_checkbox
+                            or translation_checkbox
+                        ):
+                            # If the start button is clicked
+                            if start_button:
+                                # If the user has also selected the translation checkbox among other checkboxes
+                                if translation_checkbox:
+                                    # If the user has selected a language to translate from and to, start analyzing the transcription
+                                    if (
+                                        selected_from_language
+                                        and selected_to_language is not None
+                                    ):
+                                        # Get the Snowflake Cortex LLM calls of the selected analysis features, which run below the form
+                                        analysis_tasks = get_analysis_tasks(
+                                            summary_checkbox,
+                                            agenda_checkbox,
+                                            participants_checkbox
+                                            and speaker_stats is None,
+                                            sentiment_checkbox,
+                                            translation_checkbox,
+                                        )
+                                    # If the user has not selected a language to translate from and to, show a toast notification
                                     else:
-                                        # Show a spinner while analyzing the transcription
-                                        with st.spinner(
-                                            "Analyzing the transcription..."
-                                        ):
-                                            # Run the analyze_transcription function
-                                            analysis_result = analyze_transcription(
-                                                selected_transcription_value,
-                                                summary_checkbox,
-                                                agenda_checkbox,
-                                                participants_checkbox,
-                                                sentiment_checkbox,
-                                                translation_checkbox,
-                                                selected_from_language,
-                                                selected_to_language,
-                                            )
-
-                                # If the stop button is clicked, stop analyzing the transcription
-                                if stop_button:
-                                    st.stop()
-
-                            # If no checkbox is checked
-                            if not (
-                                summary_checkbox
-                                or agenda_checkbox
-                                or participants_checkbox
-                                or sentiment_checkbox
-                                or translation_checkbox
-                            ):
-                                # If the start button is clicked
-                                if start_button:
-                                    # Show a toast notification
-                                    st.toast(
-                                        body="Please select at least one analysis feature to start the analysis.",
-                                        icon="❌",
-                                    )
-
-                                # If the stop button is clicked
-                                if stop_button:
-                                    # Show a toast notification
-                                    st.toast(
-                                        body="Analyzing the transcription can be stopped only after starting it.",
-                                        icon="❌",
+                                        st.toast(
+                                            body="Please select a language to translate from and to.",
+                                            icon="❌",
+                                        )
+                                # If the user has not selected the translation checkbox but any other checkbox is checked, start analyzing the transcription
+                                else:
+                                    # Get the Snowflake Cortex LLM calls of the selected analysis features, which run below the form
+                                    analysis_tasks = get_analysis_tasks(
+                                        summary_checkbox,
+                                        agenda_checkbox,
+                                        participants_checkbox and speaker_stats is None,
+                                        sentiment_checkbox,
+                                        translation_checkbox,
                                     )
-                else:
-                    # EDGE CASE!
-                    # If the user has not selected a transcription to analyze
-                    # Add an error message
-                    st.error(
-                        body="No transcription is selected to analyze. Please select a transcription to analyze.",
-                        icon="❗",
-                    )
 
-                    # Add a CTA button to go back to Step 2
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.write("&nbsp;")
-                    with col2:
-                        cta_button = st.button(
-                            "Select a transcription", use_container_width=True
-                        )
-                    with col3:
-                        st.write("&nbsp;")
+                            # If the stop button is clicked, stop analyzing the transcription
+                            if stop_button:
+                                st.stop()
+
+                        # If no checkbox is checked
+                        if not (
+                            summary_checkbox
+                            or agenda_checkbox
+                            or participants_checkbox
+                            or sentiment_checkbox
+                            or translation_checkbox
+                        ):
+                            # If the start button is clicked
+                            if start_button:
+                                # Show a toast notification
+                                st.toast(
+                                    body="Please select at least one analysis feature to start the analysis.",
+                                    icon="❌",
+                                )
 
-                    if cta_button:
-                        st.switch_page("pages/2_Select_a_transcription.py")
+                            # If the stop button is clicked
+                            if stop_button:
+                                # Show a toast notification
+                                st.toast(
+                                    body="Analyzing the transcription can be stopped only after starting it.",
+                                    icon="❌",
+                                )
             else:
+                # EDGE CASE!
                 # If the user has not selected a transcription to analyze
                 # Add an error message
                 st.error(
@@ -590,7 +911,7 @@ def main():
                     st.write("&nbsp;")
                 with col2:
                     cta_button = st.button(
-                        "Go back to Step 2", use_container_width=True
+                        "Select a transcription", use_container_width=True
                     )
                 with col3:
                     st.write("&nbsp;")
@@ -598,213 +919,192 @@ def main():
                 if cta_button:
                     st.switch_page("pages/2_Select_a_transcription.py")
         else:
-            # If there are no transcription keys in the session state
+            # If the user has not selected a transcription to analyze
             # Add an error message
             st.error(
-                body="No transcriptions are available to analyze. Please upload a meeting to get a transcription.",
+                body="No transcription is selected to analyze. Please select a transcription to analyze.",
                 icon="❗",
             )
 
-            # Add a CTA button to go back to Step 1
+            # Add a CTA button to go back to Step 2
             col1, col2, col3 = st.columns(3)
             with col1:
                 st.write("&nbsp;")
             with col2:
-                cta_button = st.button(
-                    "Start using ArcticMeet 🚀",
-                    type="primary",
-                    use_container_width=True,
-                )
+                cta_button = st.button("Go back to Step 2", use_container_width=True)
             with col3:
                 st.write("&nbsp;")
 
-            # If the CTA button is clicked, switch pages
             if cta_button:
-                st.switch_page("pages/1_Upload_a_meeting.py")
-
-        if analysis_result:
-            # Get the summary, keywords, agenda, participants, sentiment_df and translation from the analysis result
-            # Unpack only the non-None values from analysis_result
-            (
-                summary,
-                keywords,
-                agenda,
-                participants,
-                sentiment_df,
-                translation,
-            ) = analysis_result
-
-            # Add a spacer
-            st.markdown(
-                "<div style='margin-top: 0.5rem;'>&nbsp;</div>", unsafe_allow_html=True
-            )
-
-            # Create a list to store the names of the tabs
-            tab_names = []
-
-            # Check if there's a summary and keywords result
-            if summary and keywords:
-                tab_names.append("Summary")
-
-            # Check if there's an agenda result
-            if agenda:
-                tab_names.append("Agenda")
-
-            # Check if there's a participants result
-            if participants:
-                tab_names.append("Participants")
-
-            # Check if there's a sentiment result
-            if not sentiment_df.empty:
-                tab_names.append("Sentiment")
-
-            # Check if there's a translation result
-            if translation:
-                tab_names.append("Translation")
-
-            # Add tabs only if there are names in the list
-            if tab_names:
-                st.header("Meeting analysis")
-
-                tabs = st.tabs(tab_names)
-
-                if "Summary" in tab_names:
-                    with tabs[tab_names.index("Summary")]:
-                        st.subheader("Summary of the meeting")
-                        st.write(summary)
-
-                        # Keywords
-                        # Parse the JSON string into a dictionary
-                        keywords_dict = json.loads(keywords)
-
-                        # Access the "keywords" key in the dictionary
-                        get_keywords = keywords_dict["keywords"]
-
-                        # Wrap each keyword with a <span> element
-                        keyword_spans = [
-                            f"<span>:blue-background[{keyword}]</span>"
-                            for keyword in get_keywords
-                        ]
-
-                        # Concatenate the <span> elements together
-                        keyword_string_with_spans = " ".join(keyword_spans)
-
-                        # Display the keywords with <span> elements
-                        st.markdown(
-                            f"Keywords: {keyword_string_with_spans}",
-                            unsafe_allow_html=True,
-                        )
-                if "Agenda" in tab_names:
-                    with tabs[tab_names.index("Agenda")]:
-                        st.subheader("Agenda of the meeting")
-                        st.write(agenda)
-                if "Participants" in tab_names:
-                    with tabs[tab_names.index("Participants")]:
-                        st.subheader("Participants of the meeting")
-
-                        participants_dict = json.loads(participants)
-
-                        get_key = list(participants_dict.keys())[0]
-
-                        # Lists to store image URLs, captions and genders
-                        images = []
-                        captions = []
-                        genders = []
-
-                        # If Snowflake Arctic was able to extract names and sexes
-                        if get_key == "participants_names":
-                            get_participants = participants_dict[get_key]
-
-                            for participant in get_participants:
-                                name = participant["name"]
-                                sex = participant["sex"]
-
-                                # Determine the image URL based on the participant's sex
-                                image_url = (
-                                    "images/girl.png"
-                                    if sex == "female"
-                                    else "images/boy.png"
-                                )
-
-                                # Append the image URL to the list
-                                images.append(image_url)
-
-                                # Append the participant's name as caption
-                                captions.append(name)
-
-                                # Append the gender to the list
-                                genders.append(sex)
-
-                            # Display the images
-                            st.image(images, width=75, caption=captions)
-
-                            st.subheader("Distribution of male vs female participants")
-
-                            # Count the occurrences of each gender
-                            gender_counts = pd.Series(genders).value_counts()
-
-                            # Create a Plotly pie chart
-                            fig = px.pie(
-                                values=gender_counts.values,  # Gender counts
-                                names=gender_counts.index,  # Gender labels (male/female)
-                            )
+                st.switch_page("pages/2_Select_a_transcription.py")
+    else:
+        # If there are no stored transcriptions
+        # Add an error message
+        st.error(
+            body="No transcriptions are available to analyze. Please upload a meeting to get a transcription.",
+            icon="❗",
+        )
 
-                            # Display the bar chart
-                            st.plotly_chart(fig, use_container_width=True)
+        # Add a CTA button to go back to Step 1
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.write("&nbsp;")
+        with col2:
+            cta_button = st.button(
+                "Start using ArcticMeet 🚀",
+                type="primary",
+                use_container_width=True,
+            )
+        with col3:
+            st.write("&nbsp;")
 
-                            # Add an info message
-                            st.info(
-                                body="This analysis feature is the least reliable because it depends on names being mentioned in the meeting at any point. It might happen that ArcticMeet doesn't find all participants but only some of them.",
-                                icon="ℹ️",
-                            )
+        # If the CTA button is clicked, switch pages
+        if cta_button:
+            st.switch_page("pages/1_Upload_a_meeting.py")
 
-                        # If Snowflake Arctic was not able to extract names and sexes, but was able to extract the number of participants
-                        if get_key == "participants_number":
-                            get_participants = participants_dict[get_key]
+    # If the transcription analysis was started
+    if analysis_tasks is not None:
+        # Add a spacer
+        st.markdown(
+            "<div style='margin-top: 0.5rem;'>&nbsp;</div>", unsafe_allow_html=True
+        )
 
-                            st.write(
-                                f"There were :blue-background[{get_participants}] participants in the meeting."
-                            )
+        st.header("Meeting analysis")
 
-                            # Add an info message
-                            st.info(
-                                body="This analysis feature is the least reliable because it depends on the number of participants being mentioned in the meeting at any point. It might happen that ArcticMeet doesn't find all participants but only some of them.",
-                                icon="ℹ️",
-                            )
+        # Add a tab for every selected analysis feature, in the same order as the checkboxes
+        tab_names = [
+            tab_name
+            for tab_name in ANALYSIS_TABS
+            if tab_name in {ANALYSIS_TASK_TABS[task] for task in analysis_tasks}
+            or (tab_name == "Participants" and speaker_stats is not None)
+        ]
+        tabs = st.tabs(tab_names)
+
+        # Add a placeholder to every tab, which is replaced by the result of the analysis feature as soon as it arrives
+        tab_placeholders = {}
+        for tab_name, tab in zip(tab_names, tabs):
+            with tab:
+                tab_placeholders[tab_name] = st.empty()
+                tab_placeholders[tab_name].info(
+                    body="ArcticMeet is analyzing the transcription...", icon="⏳"
+                )
 
-                        # If Snowflake Arctic was not able to extract names and sexes, and was not able to extract the number of participants
-                        if get_key == "participants_fail":
-                            get_participants = participants_dict[get_key]
+        # If speakers were identified in Step 1, the participants are already known
+        if speaker_stats is not None:
+            with tab_placeholders["Participants"].container():
+                show_participants(None, speaker_stats)
+
+        # Results stored from an earlier analysis of the transcription are shown right away instead of calling Snowflake Cortex again, unless the user asked to analyze it again
+        saved_results = (
+            {}
+            if analyze_again_checkbox
+            else get_saved_analysis_results(
+                selected_transcript.id,
+                analysis_tasks,
+                selected_from_language,
+                selected_to_language,
+            )
+        )
+        if saved_results:
+            st.caption(
+                'Some results are from an earlier analysis of this transcription, so Snowflake Cortex wasn\'t called again for them. Check "Analyze again" to replace them.'
+            )
 
+        # Run the Snowflake Cortex LLM calls of all other selected analysis features at the same time and show every result as soon as it arrives
+        analysis_results = {}
+        failed_tabs = set()
+        new_analysis_results = iter_analysis_results(
+            [task for task in analysis_tasks if task not in saved_results],
+            selected_transcription_value,
+            selected_from_language,
+            selected_to_language,
+            st.session_state["session_id"],
+        )
+        # The calls are stopped as soon as the loop is left, including when the analysis is stopped or the page is rerun while it's running
+        try:
+            with st.spinner("Analyzing the transcription..."):
+                for task, result, error in itertools.chain(
+                    ((task, result, None) for task, result in saved_results.items()),
+                    new_analysis_results,
+                ):
+                    tab_name = ANALYSIS_TASK_TABS[task]
+
+                    # If the call failed, show the error in its tab instead of a result
+                    if error is not None:
+                        failed_tabs.add(tab_name)
+                        with tab_placeholders[tab_name].container():
                             st.error(
-                                body=get_participants,
+                                body=f"ArcticMeet could not get this analysis from Snowflake Cortex: {error}",
                                 icon="❌",
                             )
-                if "Sentiment" in tab_names:
-                    with tabs[tab_names.index("Sentiment")]:
-                        st.subheader("Sentiment of the meeting")
-                        st.line_chart(sentiment_df["Sentiment"])
-                        st.data_editor(sentiment_df, disabled=True)
-                if "Translation" in tab_names:
-                    with tabs[tab_names.index("Translation")]:
-                        st.subheader("Translation of the meeting")
-                        st.write(translation)
-
-                        # Add an info message
-                        st.info(
-                            body="""
-                                If the translation is cut off, it's because the transcription is too long and hits the context limit of the Translate() Snowflake Cortex LLM function. There are two possible solutions:
-
-                                1. The Translate() Snowflake Cortex LLM function gets an update with a larger context limit.
-                                2. I change the code so that the transcription is sent to the Translate() Snowflake Cortex LLM function in chunks, but to do this, I need to know which tokenizer Snowflake Arctic uses. I couldn't find this information anywhere.
-                            """,
-                            icon="ℹ️",
+                        continue
+
+                    analysis_results[task] = result
+
+                    # Show the result in its tab once all the calls the tab needs are done
+                    if tab_name not in failed_tabs and all(
+                        other_task in analysis_results
+                        for other_task in analysis_tasks
+                        if ANALYSIS_TASK_TABS[other_task] == tab_name
+                    ):
+                        with tab_placeholders[tab_name].container():
+                            if tab_name == "Summary":
+                                show_summary(
+                                    analysis_results["summary"],
+                                    analysis_results["keywords"],
+                                )
+                            elif tab_name == "Agenda":
+                                show_agenda(analysis_results["agenda"])
+                            elif tab_name == "Participants":
+                                show_participants(
+                                    analysis_results["participants"], None
+                                )
+                            elif tab_name == "Sentiment":
+                                show_sentiment(analysis_results["sentiment"])
+                            elif tab_name == "Translation":
+                                show_translation(analysis_results["translation"])
+        finally:
+            new_analysis_results.close()
+
+        # Store the new results next to the transcription in the transcript catalog, so they can be exported with it and shown again later
+        # Nothing is stored if there are no new results, like when every call failed
+        new_results = {
+            task: result
+            for task, result in analysis_results.items()
+            if task not in saved_results
+        }
+        sentiment_df = new_results.get("sentiment")
+        translation = new_results.get("translation")
+        if new_results:
+            transcript_store.save_analysis(
+                selected_transcript.id,
+                summary=new_results.get("summary"),
+                keywords=new_results.get("keywords"),
+                agenda=new_results.get("agenda"),
+                participants=new_results.get("participants"),
+                sentiment=(
+                    [
+                        {
+                            "sentence": sentence,
+                            # A sentence Snowflake Cortex couldn't score is stored without a sentiment
+                            "sentiment": (
+                                None if pd.isna(sentiment) else float(sentiment)
+                            ),
+                        }
+                        for sentence, sentiment in zip(
+                            sentiment_df["Sentence"], sentiment_df["Sentiment"]
                         )
+                    ]
+                    if sentiment_df is not None and not sentiment_df.empty
+                    else None
+                ),
+                translation=translation,
+                translation_from=selected_from_language if translation else None,
+                translation_to=selected_to_language if translation else None,
+            )
 
-    finally:
-        if session:
-            # Close Snowflake session
-            session.close()
+    # Show how much memory this session takes on the server
+    show_memory_usage()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,160 @@
+# Import libraries
+import threading
+from collections import Counter
+
+from utils import config
+
+# Process-wide registry of loaded ASR pipelines, keyed by model name and quantization
+# Streamlit re-executes page scripts on every rerun, but imported modules are kept, so every session shares these pipelines
+_pipelines = {}
+_pipelines_lock = threading.Lock()
+
+
+# Define an error raised when a transcription is cancelled while the model is running
+class TranscriptionCancelledError(Exception):
+    pass
+
+
+# Define a function to get the stopping criteria that abort the model as soon as the transcription is cancelled
+# The model checks them after every generated token, so a cancelled transcription stops within one decoding step instead of finishing its segment
+def _cancel_stopping_criteria(cancel_event):
+    from transformers import StoppingCriteria, StoppingCriteriaList
+
+    class CancelStoppingCriteria(StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs):
+            if cancel_event.is_set():
+                raise TranscriptionCancelledError()
+            return False
+
+    return StoppingCriteriaList([CancelStoppingCriteria()])
+
+
+# Define a function to get the language Whisper detected in a transcription as an ISO 639-1 code, or None if no language was detected
+# Every chunk is labelled with the name of its language, and the most common one wins
+def _detected_language(chunks):
+    languages = Counter(
+        chunk["language"] for chunk in chunks if chunk.get("language") is not None
+    )
+    if not languages:
+        return None
+
+    from transformers.models.whisper.tokenization_whisper import TO_LANGUAGE_CODE
+
+    language = languages.most_common(1)[0][0]
+
+    return TO_LANGUAGE_CODE.get(language, language)
+
+
+# Define a function to load an ASR pipeline
+# The torch intra-op threads are limited first, both in the worker processes and when meetings are transcribed in this process
+# With quantization, the weights of all linear layers are converted to int8 and activations are quantized on the fly
+# Torch and Transformers are imported here, so pages that never transcribe don't pay for importing them
+def _load_asr_pipeline(model_name, quantize):
+    import torch
+    from transformers import pipeline
+
+    torch.set_num_threads(config.ASR_TORCH_THREADS)
+
+    pipe = pipeline("automatic-speech-recognition", model_name)
+
+    if quantize:
+        pipe.model = torch.quantization.quantize_dynamic(
+            pipe.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+        )
+
+    return pipe
+
+
+# Define a function to get the ASR pipeline for a model, loading it only the first time it's requested
+def get_asr_pipeline(model_name=None, quantize=None):
+    if model_name is None:
+        model_name = config.ASR_MODEL
+    if quantize is None:
+        quantize = config.ASR_QUANTIZE
+
+    key = (model_name, quantize)
+    pipe = _pipelines.get(key)
+    if pipe is None:
+        with _pipelines_lock:
+            # Check again in case another session loaded the model while this one was waiting for the lock
+            pipe = _pipelines.get(key)
+            if pipe is None:
+                pipe = _load_asr_pipeline(model_name, quantize)
+                _pipelines[key] = pipe
+
+    return pipe
+
+
+# Define a function to load the ASR pipeline in the background, so the first transcription doesn't pay for it
+def preload_asr_pipeline(model_name=None, quantize=None):
+    thread = threading.Thread(
+        target=get_asr_pipeline,
+        args=(model_name, quantize),
+        name="arcticmeet-asr-preload",
+        daemon=True,
+    )
+    thread.start()
+
+    return thread
+
+
+# Define a function to transcribe 16 kHz mono audio samples
+# In long-form mode, the audio is cut into overlapping windows that are run through the model in batches, and the text is stitched together at the overlaps
+# Without it, Whisper only sees the first 30 seconds of the meeting
+# The timestamped chunks (words or segments) are returned under "chunks", and the language Whisper detected under "language"
+# With a cancel event, TranscriptionCancelledError is raised as soon as the event is set
+def transcribe(
+    audio,
+    model_name=None,
+    quantize=None,
+    return_timestamps=None,
+    long_form=True,
+    chunk_length_s=None,
+    stride_length_s=None,
+    batch_size=None,
+    cancel_event=None,
+):
+    if cancel_event is not None and cancel_event.is_set():
+        raise TranscriptionCancelledError()
+
+    # There is nothing to transcribe if all of the audio was skipped as silence
+    if audio.shape[0] == 0:
+        return {"text": "", "chunks": [], "language": None}
+
+    if return_timestamps is None:
+        return_timestamps = "word" if config.ASR_TIMESTAMPS == "word" else True
+
+    pipe = get_asr_pipeline(model_name, quantize)
+    inputs = {"raw": audio, "sampling_rate": config.SAMPLING_RATE}
+    generate_kwargs = {}
+    if cancel_event is not None:
+        generate_kwargs["stopping_criteria"] = _cancel_stopping_criteria(cancel_event)
+
+    if not long_form:
+        transcription = pipe(
+            inputs,
+            return_timestamps=return_timestamps,
+            return_language=True,
+            generate_kwargs=generate_kwargs,
+        )
+    else:
+        if chunk_length_s is None:
+            chunk_length_s = config.ASR_CHUNK_LENGTH_S
+        if stride_length_s is None:
+            stride_length_s = config.ASR_STRIDE_LENGTH_S
+        if batch_size is None:
+            batch_size = config.ASR_BATCH_SIZE
+
+        transcription = pipe(
+            inputs,
+            chunk_length_s=chunk_length_s,
+            stride_length_s=stride_length_s,
+            batch_size=batch_size,
+            return_timestamps=return_timestamps,
+            return_language=True,
+            generate_kwargs=generate_kwargs,
+        )
+
+    transcription["language"] = _detected_language(transcription.get("chunks", []))
+
+    return transcription
@@ -0,0 +1,97 @@
+# Import libraries
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from utils import config
+
+# Process-wide pool of transcription workers, created on first use
+_pool = None
+_pool_lock = threading.Lock()
+
+# Process-wide manager of the cancel events shared with the workers, created on first use
+_manager = None
+
+
+# Define a function to initialize a worker process
+# Each worker loads the Whisper model once, which also limits its torch intra-op threads, so it stays warm for every segment it gets
+def _init_worker(model_name):
+    from utils.asr import get_asr_pipeline
+
+    get_asr_pipeline(model_name)
+
+
+# Define a function to transcribe one segment of a meeting in a worker process
+def _transcribe_segment(audio, model_name, cancel_event):
+    from utils.asr import transcribe
+
+    transcription = transcribe(audio, model_name=model_name, cancel_event=cancel_event)
+
+    return {
+        "text": transcription["text"],
+        "chunks": transcription.get("chunks", []),
+        "language": transcription.get("language"),
+    }
+
+
+# Define a function to get the process-wide transcription pool
+def get_transcription_pool():
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            # Use spawn, because forking a process that already runs torch and Streamlit threads is unsafe
+            _pool = ProcessPoolExecutor(
+                max_workers=config.ASR_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(config.ASR_MODEL,),
+            )
+
+    return _pool
+
+
+# Define a function to create the event that cancels a transcription
+# With worker processes, the event lives in a manager process, so the workers see it being set while they're transcribing a segment
+def create_cancel_event():
+    global _manager
+
+    if config.ASR_WORKERS <= 1:
+        return threading.Event()
+
+    with _pool_lock:
+        if _manager is None:
+            _manager = multiprocessing.get_context("spawn").Manager()
+
+    return _manager.Event()
+
+
+# Define a function to transcribe segments of a meeting in parallel on the worker processes
+# The segments are submitted as they are decoded, with a bounded number in flight, and the transcriptions are yielded in the same order as the segments
+# With a cancel event from create_cancel_event(), the workers stop transcribing the segments of the meeting as soon as it's set
+def iter_transcribed_segments(
+    segments, model_name=None, max_pending=None, cancel_event=None
+):
+    if model_name is None:
+        model_name = config.ASR_MODEL
+    if max_pending is None:
+        max_pending = 2 * config.ASR_WORKERS
+
+    pool = get_transcription_pool()
+    pending = deque()
+
+    try:
+        for segment in segments:
+            pending.append(
+                pool.submit(_transcribe_segment, segment, model_name, cancel_event)
+            )
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # Drop the segments that haven't started yet if the transcriptions are not consumed until the end
+        for future in pending:
+            future.cancel()
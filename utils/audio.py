@@ -0,0 +1,156 @@
+# Import libraries
+import subprocess
+
+import numpy as np
+
+from utils import config
+
+
+# Define a function to build the ffmpeg command that decodes only the audio of a meeting
+# Only the first audio stream is mapped, so video, subtitle and data streams are never decoded
+def _ffmpeg_command(path, sampling_rate):
+    return [
+        "ffmpeg",
+        "-nostdin",
+        "-hide_banner",
+        "-loglevel",
+        "quiet",
+        "-i",
+        path,
+        "-map",
+        "0:a:0",
+        "-vn",
+        "-sn",
+        "-dn",
+        "-ac",
+        "1",
+        "-ar",
+        str(sampling_rate),
+        "-f",
+        "f32le",
+        "pipe:1",
+    ]
+
+
+# Define a function to get the duration of the audio of a meeting on disk in seconds, or None if it's unknown
+def probe_duration(path):
+    ffprobe_command = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-select_streams",
+        "a:0",
+        "-show_entries",
+        "format=duration",
+        "-of",
+        "default=noprint_wrappers=1:nokey=1",
+        path,
+    ]
+
+    try:
+        output = subprocess.run(
+            ffprobe_command, stdout=subprocess.PIPE, check=True, text=True
+        ).stdout
+        return float(output.strip())
+    except (FileNotFoundError, subprocess.CalledProcessError, ValueError):
+        return None
+
+
+# Define a function to stream the audio of a meeting on disk as fixed-size frames of 16 kHz mono float32 samples
+# ffmpeg reads the file by itself and resamples on the fly, so at most one frame is held in Python memory at a time
+def iter_audio_frames(path, frame_length_s=None, sampling_rate=config.SAMPLING_RATE):
+    if frame_length_s is None:
+        frame_length_s = config.AUDIO_FRAME_LENGTH_S
+
+    frame_bytes = int(frame_length_s * sampling_rate) * np.dtype(np.float32).itemsize
+
+    try:
+        process = subprocess.Popen(
+            _ffmpeg_command(path, sampling_rate),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+    except FileNotFoundError as error:
+        raise ValueError(
+            "ffmpeg was not found but is required to load audio files from filename"
+        ) from error
+
+    try:
+        total_samples = 0
+        while True:
+            data = process.stdout.read(frame_bytes)
+            if not data:
+                break
+            frame = np.frombuffer(data, np.float32)
+            total_samples += frame.shape[0]
+            yield frame
+
+        if process.wait() != 0:
+            raise ValueError(f"ffmpeg could not decode the audio of {path}")
+        if total_samples == 0:
+            raise ValueError(f"The meeting {path} does not contain any audio")
+    finally:
+        # Stop ffmpeg if the frames are not consumed until the end
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+
+
+# Define a function to decode the whole audio of a meeting on disk into 16 kHz mono float32 samples
+def load_audio(path, sampling_rate=config.SAMPLING_RATE):
+    return np.concatenate(list(iter_audio_frames(path, sampling_rate=sampling_rate)))
+
+
+# Define a function to find where to cut audio close to the given position
+# The cut is moved to the quietest 100 ms frame within the search window before the position, so words are rarely cut in half
+def _find_quiet_cut(audio, end, search_window, frame_length):
+    window_start = max(frame_length, end - search_window)
+    frames = audio[window_start:end]
+    frame_count = frames.shape[0] // frame_length
+    if frame_count == 0:
+        return end
+
+    # Compute the energy of every frame in the search window at once
+    energy = np.square(
+        frames[: frame_count * frame_length].reshape(frame_count, frame_length)
+    ).mean(axis=1)
+
+    return window_start + int(np.argmin(energy)) * frame_length + frame_length // 2
+
+
+# Define a function to group audio frames into segments of roughly the given length
+def iter_segments(
+    frames, segment_length_s, search_window_s=2.0, sampling_rate=config.SAMPLING_RATE
+):
+    segment_length = int(segment_length_s * sampling_rate)
+    search_window = int(search_window_s * sampling_rate)
+    frame_length = sampling_rate // 10
+
+    buffered_frames = []
+    buffered_samples = 0
+    for frame in frames:
+        buffered_frames.append(frame)
+        buffered_samples += frame.shape[0]
+        if buffered_samples <= segment_length:
+            continue
+
+        audio = np.concatenate(buffered_frames)
+        while audio.shape[0] > segment_length:
+            end = _find_quiet_cut(audio, segment_length, search_window, frame_length)
+            yield audio[:end]
+            audio = audio[end:]
+        buffered_frames = [audio]
+        buffered_samples = audio.shape[0]
+
+    if buffered_samples > 0:
+        yield np.concatenate(buffered_frames)
+
+
+# Define a function to stream the audio of a meeting on disk as segments of roughly the given length
+def iter_audio_segments(path, segment_length_s, sampling_rate=config.SAMPLING_RATE):
+    return iter_segments(
+        iter_audio_frames(path, sampling_rate=sampling_rate),
+        segment_length_s,
+        sampling_rate=sampling_rate,
+    )
@@ -0,0 +1,177 @@
+# Export and import the transcript catalog and the analyses of Step 3 as Parquet files
+# Usage: python -m utils.catalog_transfer export <directory>
+#        python -m utils.catalog_transfer import <file.parquet or file.zip> [...]
+
+# Import libraries
+import argparse
+import io
+import os
+import zipfile
+
+from utils import transcript_store
+
+# Names of the Parquet files an export is written to
+TRANSCRIPTS_FILE_NAME = "transcripts.parquet"
+ANALYSES_FILE_NAME = "analyses.parquet"
+
+
+# Define a function to get the Parquet schema of the transcripts
+# PyArrow is imported here, so pages that never export or import don't pay for importing it
+def _transcripts_schema():
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            ("content_hash", pa.string()),
+            ("variant", pa.string()),
+            ("name", pa.string()),
+            ("created_at", pa.float64()),
+            ("duration_s", pa.float64()),
+            ("language", pa.string()),
+            ("text", pa.string()),
+            ("timestamps", pa.string()),
+        ]
+    )
+
+
+# Define a function to get the Parquet schema of the analyses
+# The sentiment of every sentence is kept as a nested list, so reports can explode it into one row per sentence
+def _analyses_schema():
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            ("content_hash", pa.string()),
+            ("variant", pa.string()),
+            ("updated_at", pa.float64()),
+            ("summary", pa.string()),
+            ("keywords", pa.string()),
+            ("agenda", pa.string()),
+            ("participants", pa.string()),
+            (
+                "sentiment",
+                pa.list_(
+                    pa.struct([("sentence", pa.string()), ("sentiment", pa.float64())])
+                ),
+            ),
+            ("translation", pa.string()),
+            ("translation_from", pa.string()),
+            ("translation_to", pa.string()),
+        ]
+    )
+
+
+# Define a function to write rows to a Parquet file or file-like object
+def _write(rows, schema, destination):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    pq.write_table(
+        pa.Table.from_pylist(rows, schema=schema), destination, compression="zstd"
+    )
+
+    return len(rows)
+
+
+# Define a function to export all stored transcripts to a Parquet file or file-like object
+def export_transcripts(destination):
+    return _write(
+        transcript_store.export_transcripts(), _transcripts_schema(), destination
+    )
+
+
+# Define a function to export all stored analyses to a Parquet file or file-like object
+def export_analyses(destination):
+    return _write(transcript_store.export_analyses(), _analyses_schema(), destination)
+
+
+# Define a function to export all stored transcripts and analyses to one zip archive holding both Parquet files
+def export_archive(destination):
+    transcripts_file = io.BytesIO()
+    analyses_file = io.BytesIO()
+    transcripts = export_transcripts(transcripts_file)
+    analyses = export_analyses(analyses_file)
+
+    # The Parquet files are already compressed, so they're only stored in the archive
+    with zipfile.ZipFile(destination, "w", compression=zipfile.ZIP_STORED) as archive:
+        archive.writestr(TRANSCRIPTS_FILE_NAME, transcripts_file.getvalue())
+        archive.writestr(ANALYSES_FILE_NAME, analyses_file.getvalue())
+
+    return transcripts, analyses
+
+
+# Define a function to read a Parquet file made by an export and tell whether it holds transcripts or analyses
+def read_export(source):
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(source)
+    if set(_transcripts_schema().names) <= set(table.column_names):
+        return "transcripts", table.to_pylist()
+    if set(_analyses_schema().names) <= set(table.column_names):
+        return "analyses", table.to_pylist()
+
+    raise ValueError(
+        "The file is neither an export of transcriptions nor an export of analyses."
+    )
+
+
+# Define a function to import Parquet files or zip archives made by an export
+# Transcripts are imported before analyses, so the analyses find the transcripts they belong to
+# Returns the number of imported transcripts and analyses
+def import_exports(sources):
+    exports = {"transcripts": [], "analyses": []}
+    for source in sources:
+        # A zip archive made by export_archive() holds both Parquet files
+        if zipfile.is_zipfile(source):
+            if hasattr(source, "seek"):
+                source.seek(0)
+            with zipfile.ZipFile(source) as archive:
+                for member in archive.namelist():
+                    kind, rows = read_export(io.BytesIO(archive.read(member)))
+                    exports[kind].extend(rows)
+            continue
+
+        if hasattr(source, "seek"):
+            source.seek(0)
+        kind, rows = read_export(source)
+        exports[kind].extend(rows)
+
+    return (
+        transcript_store.import_transcripts(exports["transcripts"]),
+        transcript_store.import_analyses(exports["analyses"]),
+    )
+
+
+# Define the main function
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export and import transcriptions and their analyses as Parquet files"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser(
+        "export", help="Export all transcriptions and analyses to a directory"
+    )
+    export_parser.add_argument("directory")
+    import_parser = subparsers.add_parser(
+        "import", help="Import exported transcriptions and analyses"
+    )
+    import_parser.add_argument("files", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        os.makedirs(args.directory, exist_ok=True)
+        transcripts = export_transcripts(
+            os.path.join(args.directory, TRANSCRIPTS_FILE_NAME)
+        )
+        analyses = export_analyses(os.path.join(args.directory, ANALYSES_FILE_NAME))
+        print(
+            f"Exported {transcripts} transcriptions and {analyses} analyses to {args.directory}"
+        )
+    else:
+        transcripts, analyses = import_exports(args.files)
+        print(f"Imported {transcripts} transcriptions and {analyses} analyses")
+
+
+if __name__ == "__main__":
+    # Run the main function
+    main()
@@ -0,0 +1,59 @@
+# Import libraries
+import os
+import shutil
+import time
+
+from utils import config
+from utils.serialization import content_file_name, read_json, write_json
+
+# Suffix of the files holding checkpointed segments
+_SEGMENT_SUFFIX = ".json"
+
+
+# Define a function to get the checkpoint directory of a meeting hash and the settings it's transcribed with
+# The segment length and the timestamp level are part of the name, since the checkpointed segments depend on them
+def checkpoint_dir(content_hash, variant):
+    return os.path.join(
+        config.CHECKPOINT_DIR,
+        f"{content_file_name(content_hash, variant)}"
+        f".s{config.ASR_SEGMENT_LENGTH_S}.{config.ASR_TIMESTAMPS}",
+    )
+
+
+# Define a function to get the path of a checkpointed segment
+def _segment_path(directory, index):
+    return os.path.join(directory, f"{index:06d}{_SEGMENT_SUFFIX}")
+
+
+# Define a function to get a checkpointed segment, or None if the segment hasn't been transcribed yet
+def load_segment(directory, index):
+    return read_json(_segment_path(directory, index))
+
+
+# Define a function to checkpoint a transcribed segment
+def save_segment(directory, index, segment):
+    write_json(_segment_path(directory, index), segment)
+
+
+# Define a function to remove the checkpoints of a transcription once it's finished
+def remove(directory):
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+# Define a function to remove the checkpoints of transcriptions that were abandoned a long time ago
+def prune(max_age_s=None):
+    if max_age_s is None:
+        max_age_s = config.CHECKPOINT_MAX_AGE_S
+
+    try:
+        directories = list(os.scandir(config.CHECKPOINT_DIR))
+    except FileNotFoundError:
+        return
+
+    now = time.time()
+    for directory in directories:
+        try:
+            if directory.is_dir() and now - directory.stat().st_mtime > max_age_s:
+                remove(directory.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,105 @@
+# Import libraries
+import itertools
+import sys
+import threading
+import zlib
+from collections import OrderedDict
+
+from utils import config
+
+# Process-wide LRU cache of decompressed blocks, shared by all sessions
+# Sessions only hold compressed blocks, so the memory of decompressed text is bounded however many transcriptions are open
+_decoded_blocks = OrderedDict()
+_decoded_bytes = 0
+_decoded_lock = threading.Lock()
+
+# Unique keys of compressed texts in the cache of decompressed blocks
+_keys = itertools.count()
+
+
+# Define a function to cut a text into blocks of about block_length characters
+# Blocks end after a whitespace where possible, so no word is cut in half
+def _split_blocks(text, block_length):
+    blocks = []
+    start = 0
+    while start < len(text):
+        end = min(start + block_length, len(text))
+        if end < len(text):
+            cut = text.rfind(" ", start + block_length // 2, end)
+            if cut != -1:
+                end = cut + 1
+        blocks.append(text[start:end])
+        start = end
+
+    return blocks
+
+
+# Define a text held in memory as zlib-compressed blocks that are decompressed on demand
+class CompressedText:
+    __slots__ = ("_key", "_blocks", "length")
+
+    def __init__(self, text, block_length=None):
+        if block_length is None:
+            block_length = config.TEXT_BLOCK_LENGTH
+
+        self._key = next(_keys)
+        self._blocks = tuple(
+            zlib.compress(block.encode("utf-8"))
+            for block in _split_blocks(text, block_length)
+        )
+        self.length = len(text)
+
+    def __len__(self):
+        return self.length
+
+    def __str__(self):
+        return self.text
+
+    # Number of blocks the text is held in
+    @property
+    def block_count(self):
+        return len(self._blocks)
+
+    # Number of bytes of the compressed blocks
+    @property
+    def nbytes(self):
+        return sum(len(block) for block in self._blocks)
+
+    # Define a function to get a block of the text, decompressing it only if it isn't in the cache
+    def block(self, index):
+        global _decoded_bytes
+
+        key = (self._key, index)
+        with _decoded_lock:
+            block = _decoded_blocks.get(key)
+            if block is not None:
+                _decoded_blocks.move_to_end(key)
+                return block
+
+        block = zlib.decompress(self._blocks[index]).decode("utf-8")
+
+        with _decoded_lock:
+            if key not in _decoded_blocks:
+                _decoded_blocks[key] = block
+                _decoded_bytes += sys.getsizeof(block)
+
+                # Forget the least recently used blocks until the cache fits into its size budget
+                while (
+                    _decoded_bytes > config.DECODED_TEXT_CACHE_BYTES
+                    and len(_decoded_blocks) > 1
+                ):
+                    _, evicted_block = _decoded_blocks.popitem(last=False)
+                    _decoded_bytes -= sys.getsizeof(evicted_block)
+
+        return block
+
+    # The whole text, decompressed block by block
+    @property
+    def text(self):
+        return "".join(self.block(index) for index in range(len(self._blocks)))
+
+
+# Define a function to get the number of decompressed blocks in the cache and their size in bytes
+def decoded_cache_usage():
+    with _decoded_lock:
+        return len(_decoded_blocks), _decoded_bytes
@@ -0,0 +1,192 @@
+# Import libraries
+import os
+import tempfile
+
+
+# Define a function to read an integer setting from the environment
+def get_int(name, default):
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    return int(value)
+
+
+# Define a function to read a float setting from the environment
+def get_float(name, default):
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    return float(value)
+
+
+# Define a function to read a boolean setting from the environment
+def get_bool(name, default):
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Define a function to read a path setting from the environment
+def get_path(name, default):
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    return os.path.expanduser(value)
+
+
+# Directory where uploaded meetings are spooled before they are transcribed
+SPOOL_DIR = get_path(
+    "ARCTICMEET_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "arcticmeet")
+)
+
+# Directory where ArcticMeet keeps data that survives restarts
+DATA_DIR = get_path(
+    "ARCTICMEET_DATA_DIR", os.path.join(os.path.expanduser("~"), ".arcticmeet")
+)
+
+# Size of the chunks used to copy an uploaded meeting to disk (default: 8 MB)
+UPLOAD_CHUNK_SIZE = get_int("ARCTICMEET_UPLOAD_CHUNK_SIZE", 8 * 1024 * 1024)
+
+# Number of meetings that can be uploaded in a single submission
+MAX_UPLOAD_FILES = get_int("ARCTICMEET_MAX_UPLOAD_FILES", 5)
+
+# Total size of the meetings uploaded in a single submission (default: 5 GB)
+# Streamlit holds the uploaded meetings in the server's memory until they're removed from the uploader or the session ends
+MAX_UPLOAD_TOTAL_BYTES = get_int(
+    "ARCTICMEET_MAX_UPLOAD_TOTAL_BYTES", 5000 * 1024 * 1024
+)
+
+# Sampling rate expected by Whisper
+SAMPLING_RATE = 16000
+
+# Length of the frames the audio of a meeting is decoded in
+AUDIO_FRAME_LENGTH_S = get_int("ARCTICMEET_AUDIO_FRAME_LENGTH_S", 30)
+
+# Whisper models that can be selected by tier, from the fastest to the most accurate on CPU
+# The distilled models only transcribe English, but are much faster than the original models of the same accuracy
+ASR_MODEL_TIERS = {
+    "tiny": "openai/whisper-tiny",
+    "tiny.en": "openai/whisper-tiny.en",
+    "base": "openai/whisper-base",
+    "base.en": "openai/whisper-base.en",
+    "small": "openai/whisper-small",
+    "small.en": "openai/whisper-small.en",
+    "distil-small.en": "distil-whisper/distil-small.en",
+    "distil-medium.en": "distil-whisper/distil-medium.en",
+    "distil-large-v3": "distil-whisper/distil-large-v3",
+}
+
+# Tier of the Whisper model used to get transcriptions
+ASR_MODEL_TIER = os.environ.get("ARCTICMEET_ASR_MODEL_TIER") or "tiny"
+if ASR_MODEL_TIER not in ASR_MODEL_TIERS:
+    raise ValueError(
+        f"Unknown ARCTICMEET_ASR_MODEL_TIER {ASR_MODEL_TIER!r}, expected one of: {', '.join(ASR_MODEL_TIERS)}"
+    )
+
+# Whisper model used to get transcriptions (any Hugging Face model overrides the tier)
+ASR_MODEL = os.environ.get("ARCTICMEET_ASR_MODEL") or ASR_MODEL_TIERS[ASR_MODEL_TIER]
+
+# Apply int8 dynamic quantization to the Whisper model when it's loaded, which makes CPU inference faster and the model smaller
+ASR_QUANTIZE = get_bool("ARCTICMEET_ASR_QUANTIZE", False)
+
+# Level of the timestamps requested from Whisper: "word" (segments are built from the words) or "segment"
+ASR_TIMESTAMPS = os.environ.get("ARCTICMEET_ASR_TIMESTAMPS") or "word"
+if ASR_TIMESTAMPS not in ("word", "segment"):
+    raise ValueError(
+        f"Unknown ARCTICMEET_ASR_TIMESTAMPS {ASR_TIMESTAMPS!r}, expected 'word' or 'segment'"
+    )
+
+# Length of the overlapping windows long meetings are cut into (Whisper's own window is 30 s)
+ASR_CHUNK_LENGTH_S = get_int("ARCTICMEET_ASR_CHUNK_LENGTH_S", 30)
+
+# Overlap on each side of a window that is used to stitch neighbouring windows together
+ASR_STRIDE_LENGTH_S = get_int("ARCTICMEET_ASR_STRIDE_LENGTH_S", 5)
+
+# Number of windows run through the model at once
+ASR_BATCH_SIZE = get_int("ARCTICMEET_ASR_BATCH_SIZE", 8)
+
+# Length of the segments a meeting is transcribed in (the text of a segment is shown as soon as it's transcribed, and the worker processes get one segment at a time)
+ASR_SEGMENT_LENGTH_S = get_int("ARCTICMEET_ASR_SEGMENT_LENGTH_S", 60)
+
+# Number of worker processes used to transcribe a meeting (1 transcribes in the Streamlit process)
+ASR_WORKERS = get_int("ARCTICMEET_ASR_WORKERS", 1)
+
+# Number of torch intra-op threads per worker process, or of this process when meetings are transcribed in-process (by default, the CPU cores are shared evenly between the workers)
+ASR_TORCH_THREADS = get_int(
+    "ARCTICMEET_ASR_TORCH_THREADS", max(1, (os.cpu_count() or 1) // max(1, ASR_WORKERS))
+)
+
+# Number of meetings transcribed at the same time, across all sessions
+MAX_RUNNING_TRANSCRIPTION_JOBS = get_int("ARCTICMEET_MAX_RUNNING_TRANSCRIPTION_JOBS", 1)
+
+# Number of meetings that can wait to be transcribed, across all sessions
+MAX_QUEUED_TRANSCRIPTION_JOBS = get_int("ARCTICMEET_MAX_QUEUED_TRANSCRIPTION_JOBS", 20)
+
+# Number of Snowflake Cortex calls made at the same time, across all sessions
+MAX_RUNNING_CORTEX_CALLS = get_int("ARCTICMEET_MAX_RUNNING_CORTEX_CALLS", 4)
+
+# Skip silence before getting a transcription by default
+VAD_ENABLED = get_bool("ARCTICMEET_VAD", False)
+
+# Identify speakers after getting a transcription by default
+DIARIZATION_ENABLED = get_bool("ARCTICMEET_DIARIZATION", False)
+
+# Speaker embedding model used to identify speakers
+DIARIZATION_MODEL = (
+    os.environ.get("ARCTICMEET_DIARIZATION_MODEL") or "microsoft/wavlm-base-plus-sv"
+)
+
+# Cosine similarity above which two speaker embeddings are considered the same speaker
+DIARIZATION_THRESHOLD = get_float("ARCTICMEET_DIARIZATION_THRESHOLD", 0.86)
+
+# Load the ASR model when the server starts instead of on the first transcription
+PRELOAD_ASR = get_bool("ARCTICMEET_PRELOAD_ASR", False)
+
+# Directory of the on-disk transcription cache
+TRANSCRIPTION_CACHE_DIR = get_path(
+    "ARCTICMEET_TRANSCRIPTION_CACHE_DIR", os.path.join(DATA_DIR, "transcriptions")
+)
+
+# Size budget of the on-disk transcription cache (default: 512 MB)
+TRANSCRIPTION_CACHE_MAX_BYTES = get_int(
+    "ARCTICMEET_TRANSCRIPTION_CACHE_MAX_BYTES", 512 * 1024 * 1024
+)
+
+# Directory where the segments of unfinished transcriptions are checkpointed, so a retried transcription resumes where it stopped
+CHECKPOINT_DIR = get_path(
+    "ARCTICMEET_CHECKPOINT_DIR", os.path.join(DATA_DIR, "checkpoints")
+)
+
+# How long the checkpoints of an abandoned transcription are kept (default: 7 days)
+CHECKPOINT_MAX_AGE_S = get_int("ARCTICMEET_CHECKPOINT_MAX_AGE_S", 7 * 24 * 3600)
+
+# SQLite database holding the catalog of all past transcriptions
+TRANSCRIPT_DB_PATH = get_path(
+    "ARCTICMEET_TRANSCRIPT_DB", os.path.join(DATA_DIR, "transcripts.sqlite3")
+)
+
+# Number of characters per compressed block of a transcription held in memory
+TEXT_BLOCK_LENGTH = get_int("ARCTICMEET_TEXT_BLOCK_LENGTH", 64 * 1024)
+
+# Size budget of the decompressed blocks kept in memory, shared by all sessions (default: 16 MB)
+DECODED_TEXT_CACHE_BYTES = get_int(
+    "ARCTICMEET_DECODED_TEXT_CACHE_BYTES", 16 * 1024 * 1024
+)
+
+# Show the export and import of all transcriptions and analyses in Step 2
+# Anyone who can open ArcticMeet can then download the transcriptions of all users and replace them, so it's off by default
+CATALOG_TRANSFER_UI = get_bool("ARCTICMEET_CATALOG_TRANSFER_UI", False)
+
+# Number of Snowflake sessions kept open at the same time, across all sessions and credentials
+SNOWFLAKE_POOL_MAX_SIZE = get_int("ARCTICMEET_SNOWFLAKE_POOL_MAX_SIZE", 8)
+
+# How long an unused Snowflake session is kept open before it's closed (default: 10 minutes)
+SNOWFLAKE_SESSION_IDLE_TIMEOUT_S = get_int(
+    "ARCTICMEET_SNOWFLAKE_SESSION_IDLE_TIMEOUT_S", 600
+)
+
+# How long a Snowflake session is trusted after its last successful use or health check before it's checked again
+SNOWFLAKE_HEALTH_CHECK_INTERVAL_S = get_int(
+    "ARCTICMEET_SNOWFLAKE_HEALTH_CHECK_INTERVAL_S", 60
+)
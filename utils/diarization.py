@@ -0,0 +1,176 @@
+# Import libraries
+import threading
+
+import numpy as np
+
+from utils import config
+
+# Process-wide speaker embedding model, loaded on first use
+_embedding_model = None
+_embedding_model_lock = threading.Lock()
+
+# Transcript segments shorter than this don't hold enough speech to tell speakers apart
+_MIN_SEGMENT_S = 0.5
+
+# Longest audio used to compute the embedding of one transcript segment
+_MAX_SEGMENT_S = 10.0
+
+
+# Define a function to get the speaker embedding model, loading it only the first time it's requested
+def get_embedding_model():
+    global _embedding_model
+
+    if _embedding_model is None:
+        with _embedding_model_lock:
+            if _embedding_model is None:
+                from transformers import AutoFeatureExtractor, WavLMForXVector
+
+                feature_extractor = AutoFeatureExtractor.from_pretrained(
+                    config.DIARIZATION_MODEL
+                )
+                model = WavLMForXVector.from_pretrained(config.DIARIZATION_MODEL)
+                model.eval()
+                _embedding_model = (feature_extractor, model)
+
+    return _embedding_model
+
+
+# Define a function to compute a speaker embedding for every transcript segment of an audio segment
+# The times of the transcript segments are in seconds of the meeting, and the audio segment starts at start_s
+# Returns an array with one L2-normalized embedding per transcript segment, with NaNs for segments that are too short
+def embed_segments(audio, start_s, timeline, batch_size=16):
+    import torch
+
+    feature_extractor, model = get_embedding_model()
+    embedding_size = model.config.xvector_output_dim
+    embeddings = np.full((len(timeline), embedding_size), np.nan, dtype=np.float32)
+
+    # Cut the audio of every transcript segment that is long enough
+    starts = np.clip(
+        ((timeline.starts - start_s) * config.SAMPLING_RATE).astype(np.int64),
+        0,
+        audio.shape[0],
+    )
+    ends = np.clip(
+        ((timeline.ends - start_s) * config.SAMPLING_RATE).astype(np.int64),
+        0,
+        audio.shape[0],
+    )
+    ends = np.minimum(ends, starts + int(_MAX_SEGMENT_S * config.SAMPLING_RATE))
+    indexes = np.flatnonzero(ends - starts >= _MIN_SEGMENT_S * config.SAMPLING_RATE)
+
+    for batch_start in range(0, indexes.shape[0], batch_size):
+        batch = indexes[batch_start : batch_start + batch_size]
+        inputs = feature_extractor(
+            [audio[starts[index] : ends[index]] for index in batch],
+            sampling_rate=config.SAMPLING_RATE,
+            padding=True,
+            return_tensors="pt",
+        )
+        with torch.no_grad():
+            batch_embeddings = model(**inputs).embeddings
+        batch_embeddings = torch.nn.functional.normalize(batch_embeddings, dim=-1)
+        embeddings[batch] = batch_embeddings.numpy()
+
+    return embeddings
+
+
+# Define a function to cluster speaker embeddings into speakers
+# The embeddings are first assigned greedily to the closest speaker (or a new one), then refined with a few k-means passes on cosine similarity,
+# and finally speakers whose centroids are too similar are merged
+# Returns the speaker of every embedding (numbered from 0 in order of appearance), with -1 for embeddings that are NaN
+def cluster_speakers(embeddings, threshold=None, refinement_passes=5):
+    if threshold is None:
+        threshold = config.DIARIZATION_THRESHOLD
+
+    labels = np.full(embeddings.shape[0], -1, dtype=np.int16)
+    valid = np.flatnonzero(~np.isnan(embeddings).any(axis=1))
+    if valid.shape[0] == 0:
+        return labels
+    vectors = embeddings[valid]
+
+    # Greedy assignment in order of appearance
+    centroids = [vectors[0]]
+    counts = [1]
+    assigned = np.zeros(vectors.shape[0], dtype=np.int64)
+    for index in range(1, vectors.shape[0]):
+        similarities = np.stack(centroids) @ vectors[index]
+        best = int(np.argmax(similarities))
+        if similarities[best] >= threshold:
+            counts[best] += 1
+            centroids[best] = (
+                centroids[best] + (vectors[index] - centroids[best]) / counts[best]
+            )
+            assigned[index] = best
+        else:
+            centroids.append(vectors[index])
+            counts.append(1)
+            assigned[index] = len(centroids) - 1
+
+    # Refine the assignment with k-means on cosine similarity
+    for _ in range(refinement_passes):
+        centroids = _normalized_centroids(vectors, assigned)
+        new_assigned = np.argmax(vectors @ centroids.T, axis=1)
+        if np.array_equal(new_assigned, assigned):
+            break
+        assigned = new_assigned
+
+    # Merge speakers whose centroids are closer than the threshold
+    while True:
+        speakers = np.unique(assigned)
+        if speakers.shape[0] < 2:
+            break
+        centroids = _normalized_centroids(vectors, assigned)[speakers]
+        similarities = centroids @ centroids.T
+        np.fill_diagonal(similarities, -np.inf)
+        first, second = np.unravel_index(np.argmax(similarities), similarities.shape)
+        if similarities[first, second] < threshold:
+            break
+        assigned[assigned == speakers[second]] = speakers[first]
+
+    # Number the speakers in order of appearance
+    _, first_appearance, inverse = np.unique(
+        assigned, return_index=True, return_inverse=True
+    )
+    order = np.argsort(np.argsort(first_appearance))
+    labels[valid] = order[inverse]
+
+    return labels
+
+
+# Define a function to compute the L2-normalized centroid of every cluster
+def _normalized_centroids(vectors, assigned):
+    centroids = np.zeros((int(assigned.max()) + 1, vectors.shape[1]), dtype=np.float64)
+    np.add.at(centroids, assigned, vectors)
+    norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+
+    return centroids / np.where(norms == 0, 1, norms)
+
+
+# Define a function to label every transcript segment with a speaker
+# Segments that were too short to get an embedding get the speaker of the closest previous segment (or the next one at the start)
+def label_speakers(embeddings):
+    labels = cluster_speakers(embeddings)
+    known = np.flatnonzero(labels >= 0)
+    if known.shape[0] == 0:
+        return np.zeros(embeddings.shape[0], dtype=np.int16)
+
+    previous_known = np.clip(
+        np.searchsorted(known, np.arange(labels.shape[0]), side="right") - 1, 0, None
+    )
+
+    return labels[known[previous_known]].astype(np.int16)
+
+
+# Define a function to compute the participants of a meeting from its speaker labels
+# Returns the number of speakers and the talk time (in seconds) of every speaker
+def speaker_talk_times(timeline, speakers):
+    if len(timeline) == 0:
+        return 0, np.zeros(0, dtype=np.float64)
+
+    talk_times = np.bincount(
+        speakers.astype(np.int64),
+        weights=(timeline.ends - timeline.starts).astype(np.float64),
+    )
+
+    return int(np.count_nonzero(talk_times)), talk_times
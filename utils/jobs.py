@@ -0,0 +1,263 @@
+# Import libraries
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import checkpoints, config
+from utils import transcript_store, transcription_cache
+from utils.asr import TranscriptionCancelledError
+from utils.asr_pool import create_cancel_event
+from utils.audio import probe_duration
+from utils.scheduler import get_asr_scheduler
+from utils.transcription import (
+    build_transcription,
+    iter_transcription,
+    transcription_language,
+    transcription_variant,
+)
+from utils.upload import remove_spooled_upload
+
+# Possible states of a transcription job
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+# How long finished jobs are kept around, so a session can still pick up the result after a rerun
+_FINISHED_JOB_TTL_S = 3600
+
+
+# Define an error raised when too many transcription jobs are already waiting
+class TranscriptionQueueFullError(RuntimeError):
+    pass
+
+
+# Define a transcription job that runs in the background
+class TranscriptionJob:
+    def __init__(self, name, meeting_path, meeting_hash, vad, diarize, ticket):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.meeting_path = meeting_path
+        self.meeting_hash = meeting_hash
+        self.vad = vad
+        self.diarize = diarize
+        self.status = QUEUED
+        self.segments = []
+        self.duration_s = None
+        self.result = None
+        self.transcript_id = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = create_cancel_event()
+        self.ticket = ticket
+        self.future = None
+
+    @property
+    def finished(self):
+        return self.status in (DONE, CANCELLED, FAILED)
+
+    # Share of the meeting that is already transcribed
+    @property
+    def progress(self):
+        if self.status == DONE:
+            return 1.0
+        if not self.duration_s or not self.segments:
+            return 0.0
+        return min(self.segments[-1]["end_s"] / self.duration_s, 1.0)
+
+    def _finish(self, status):
+        self.status = status
+        self.finished_at = time.time()
+        remove_spooled_upload(self.meeting_path)
+
+    # Define a function to run the job on a worker thread
+    # The job waits for its turn in the ASR scheduler first, so only a bounded number of jobs use the CPU at the same time
+    def run(self):
+        scheduler = get_asr_scheduler()
+        if self.cancel_event.is_set() or not scheduler.wait(self.ticket):
+            self._finish(CANCELLED)
+            return
+
+        self.status = RUNNING
+        self.started_at = time.time()
+
+        try:
+            self._run()
+        finally:
+            scheduler.release(self.ticket)
+
+    # Define a function to transcribe the meeting of the job
+    def _run(self):
+        try:
+            variant = transcription_variant(vad=self.vad, diarize=self.diarize)
+            result = transcription_cache.get(self.meeting_hash, variant)
+
+            if result is None:
+                self.duration_s = probe_duration(self.meeting_path)
+
+                # Segments are checkpointed under the hash of the meeting, so a job retried after a cancellation, a failure or a restart resumes where the last one stopped
+                checkpoints.prune()
+                checkpoint_dir = checkpoints.checkpoint_dir(self.meeting_hash, variant)
+
+                # The model checks the cancel event while it's running, so a cancelled job frees its CPU right away instead of finishing the current segment
+                segments = iter_transcription(
+                    self.meeting_path,
+                    vad=self.vad,
+                    diarize=self.diarize,
+                    checkpoint_dir=checkpoint_dir,
+                    cancel_event=self.cancel_event,
+                )
+                try:
+                    for segment in segments:
+                        if self.cancel_event.is_set():
+                            break
+                        self.segments.append(segment)
+                except TranscriptionCancelledError:
+                    pass
+                finally:
+                    segments.close()
+
+                if self.cancel_event.is_set():
+                    self._finish(CANCELLED)
+                    return
+
+                result = build_transcription(self.segments)
+                transcription_cache.put(self.meeting_hash, result, variant)
+                checkpoints.remove(checkpoint_dir)
+
+            # Store the transcription in the transcript catalog, so it's listed in Step 2 for every session, even after this one ends
+            self.transcript_id = transcript_store.add(
+                self.meeting_hash,
+                variant,
+                self.name,
+                result["text"],
+                duration_s=result.get("duration_s"),
+                language=transcription_language(result),
+                timestamps={
+                    "segments": result.get("segments"),
+                    "words": result.get("words"),
+                    "speakers": result.get("speakers"),
+                },
+            )
+
+            # The transcription is in the catalog now, so only what Step 1 shows of it is kept, and memory doesn't grow with the number of finished jobs
+            self.segments = [
+                {
+                    "start_s": segment["start_s"],
+                    "end_s": segment["end_s"],
+                    "text": segment["text"],
+                }
+                for segment in self.segments
+            ]
+            self.result = {
+                "duration_s": result["duration_s"],
+                "skipped_s": result["skipped_s"],
+            }
+            self._finish(DONE)
+        except Exception as error:
+            self.error = error
+            self._finish(FAILED)
+
+
+# Define a process-wide manager that runs transcription jobs in the background
+# Every job gets a worker thread right away, but only as many jobs as the ASR scheduler allows run at the same time, so concurrent uploads don't oversubscribe the host
+# Jobs from different sessions take turns in the scheduler, so a session that uploads a large batch doesn't hold back the others
+class TranscriptionJobManager:
+    def __init__(self, max_running_jobs, max_queued_jobs):
+        self.max_queued_jobs = max_queued_jobs
+        self._scheduler = get_asr_scheduler()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_running_jobs + max_queued_jobs,
+            thread_name_prefix="arcticmeet-transcription",
+        )
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    # Define a function to queue a new transcription job for a session
+    def submit(
+        self, session_id, name, meeting_path, meeting_hash, vad=False, diarize=False
+    ):
+        with self._lock:
+            self._prune()
+
+            if self.queue_length() >= self.max_queued_jobs:
+                raise TranscriptionQueueFullError(
+                    "Too many meetings are waiting to be transcribed. Please try again later."
+                )
+
+            job = TranscriptionJob(
+                name,
+                meeting_path,
+                meeting_hash,
+                vad,
+                diarize,
+                self._scheduler.enqueue(session_id),
+            )
+            self._jobs[job.id] = job
+            job.future = self._executor.submit(job.run)
+
+        return job
+
+    # Define a function to get a job by its id, or None if it doesn't exist (anymore)
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    # Define a function to cancel a job
+    # A queued job never starts, and a running job stops within one decoding step of the model
+    def cancel(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return False
+
+        job.cancel_event.set()
+        self._scheduler.discard(job.ticket)
+        if job.future.cancel():
+            job._finish(CANCELLED)
+
+        return True
+
+    # Define a function to get the number of jobs waiting to start
+    def queue_length(self):
+        return sum(1 for job in list(self._jobs.values()) if job.status == QUEUED)
+
+    # Define a function to get the position of a queued job in the queue (1 = next to start)
+    def queue_position(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None or job.status != QUEUED:
+            return 0
+
+        return self._scheduler.queue_position(job.ticket)
+
+    # Define a function to get the queue depth and wait time metrics of the transcriptions
+    def stats(self):
+        return self._scheduler.stats()
+
+    # Define a function to forget jobs that finished a long time ago
+    def _prune(self):
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and now - job.finished_at > _FINISHED_JOB_TTL_S:
+                del self._jobs[job_id]
+
+
+# Process-wide job manager, created on first use
+_manager = None
+_manager_lock = threading.Lock()
+
+
+# Define a function to get the process-wide job manager
+def get_job_manager():
+    global _manager
+
+    with _manager_lock:
+        if _manager is None:
+            _manager = TranscriptionJobManager(
+                config.MAX_RUNNING_TRANSCRIPTION_JOBS,
+                config.MAX_QUEUED_TRANSCRIPTION_JOBS,
+            )
+
+    return _manager
@@ -0,0 +1,33 @@
+# Import libraries
+import sys
+
+import numpy as np
+
+
+# Define a function to estimate the memory an object and everything it references take, in bytes
+# Objects with an nbytes attribute, like arrays, timelines and compressed texts, report their own size
+def deep_sizeof(obj, seen=None):
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    # An array that owns its data already counts it, a view doesn't
+    if isinstance(obj, np.ndarray):
+        return sys.getsizeof(obj) + (obj.nbytes if obj.base is not None else 0)
+    if hasattr(obj, "nbytes") and not isinstance(obj, type):
+        return sys.getsizeof(obj) + obj.nbytes
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(
+            deep_sizeof(key, seen) + deep_sizeof(value, seen)
+            for key, value in obj.items()
+        )
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+
+    return size
@@ -0,0 +1,164 @@
+# Import libraries
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+from utils import config
+
+# Number of recent waits the average wait time is computed from
+_RECENT_WAITS = 100
+
+
+# Define a ticket that holds the place of a session in the queue of a scheduler
+class Ticket:
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.enqueued_at = time.time()
+        self.granted_at = None
+        self.discarded = False
+
+
+# Define a process-wide scheduler that lets a bounded number of tasks run at the same time
+# Every session waits in its own queue, and the sessions take turns, so a session that queues many tasks doesn't hold back the others
+class FairScheduler:
+    def __init__(self, name, max_running):
+        self.name = name
+        self.max_running = max_running
+        self._queues = OrderedDict()
+        self._running = 0
+        self._recent_waits = deque(maxlen=_RECENT_WAITS)
+        self._condition = threading.Condition()
+
+    # Define a function to get the waiting tickets in the order they will run
+    # The first ticket of every session comes first, then the second one of every session, and so on
+    def _waiting_tickets(self):
+        queues = [list(queue) for queue in self._queues.values()]
+        return [
+            queue[turn]
+            for turn in range(max(map(len, queues), default=0))
+            for queue in queues
+            if turn < len(queue)
+        ]
+
+    # Define a function to remove a ticket from its session queue
+    # If the ticket is removed because it's its turn, the other sessions go first next time
+    def _dequeue(self, ticket, rotate=False):
+        queue = self._queues.get(ticket.session_id)
+        if queue is None or ticket not in queue:
+            return
+
+        queue.remove(ticket)
+        if not queue:
+            del self._queues[ticket.session_id]
+        elif rotate:
+            self._queues.move_to_end(ticket.session_id)
+
+    # Define a function to put a session in the queue
+    def enqueue(self, session_id):
+        ticket = Ticket(session_id)
+        with self._condition:
+            self._queues.setdefault(session_id, deque()).append(ticket)
+
+        return ticket
+
+    # Define a function to wait until it's the turn of a ticket and a slot is free
+    # Returns False if the ticket was discarded while waiting
+    def wait(self, ticket):
+        with self._condition:
+            while not ticket.discarded:
+                waiting_tickets = self._waiting_tickets()
+                if (
+                    self._running < self.max_running
+                    and waiting_tickets
+                    and waiting_tickets[0] is ticket
+                ):
+                    self._dequeue(ticket, rotate=True)
+                    self._running += 1
+                    ticket.granted_at = time.time()
+                    self._recent_waits.append(ticket.granted_at - ticket.enqueued_at)
+                    self._condition.notify_all()
+                    return True
+
+                self._condition.wait()
+
+        return False
+
+    # Define a function to free the slot of a ticket once its task is done
+    def release(self, ticket):
+        with self._condition:
+            if ticket.granted_at is not None:
+                ticket.granted_at = None
+                self._running -= 1
+                self._condition.notify_all()
+
+    # Define a function to take a ticket out of the queue, for example when its task is cancelled
+    def discard(self, ticket):
+        with self._condition:
+            ticket.discarded = True
+            self._dequeue(ticket)
+            self._condition.notify_all()
+
+    # Define a function to run a task in a slot of the scheduler
+    @contextmanager
+    def slot(self, session_id):
+        ticket = self.enqueue(session_id)
+        try:
+            self.wait(ticket)
+            yield ticket
+        finally:
+            self.discard(ticket)
+            self.release(ticket)
+
+    # Define a function to get the position of a ticket in the queue (1 = next to run), or 0 if it's not waiting
+    def queue_position(self, ticket):
+        with self._condition:
+            waiting_tickets = self._waiting_tickets()
+            if ticket not in waiting_tickets:
+                return 0
+            return waiting_tickets.index(ticket) + 1
+
+    # Define a function to get the queue depth and wait time metrics of the scheduler
+    def stats(self):
+        with self._condition:
+            now = time.time()
+            waiting_tickets = self._waiting_tickets()
+            return {
+                "running": self._running,
+                "max_running": self.max_running,
+                "queued": len(waiting_tickets),
+                "waiting_sessions": len(self._queues),
+                "average_wait_s": (
+                    sum(self._recent_waits) / len(self._recent_waits)
+                    if self._recent_waits
+                    else 0.0
+                ),
+                "longest_wait_s": max(
+                    (now - ticket.enqueued_at for ticket in waiting_tickets),
+                    default=0.0,
+                ),
+            }
+
+
+# Process-wide schedulers, created on first use
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+# Define a function to get a process-wide scheduler by its name
+def _get_scheduler(name, max_running):
+    with _schedulers_lock:
+        if name not in _schedulers:
+            _schedulers[name] = FairScheduler(name, max_running)
+
+    return _schedulers[name]
+
+
+# Define a function to get the scheduler of the transcriptions, which all share the CPU of the host
+def get_asr_scheduler():
+    return _get_scheduler("asr", config.MAX_RUNNING_TRANSCRIPTION_JOBS)
+
+
+# Define a function to get the scheduler of the Snowflake Cortex calls
+def get_cortex_scheduler():
+    return _get_scheduler("cortex", config.MAX_RUNNING_CORTEX_CALLS)
@@ -0,0 +1,88 @@
+# Import libraries
+import base64
+import json
+import os
+import re
+import tempfile
+
+import numpy as np
+
+from utils.timestamps import Timeline
+
+
+# Define a function to convert the values JSON doesn't know, like timelines and arrays, to JSON
+def _encode_value(value):
+    if isinstance(value, Timeline):
+        return {"__timeline__": value.to_dict()}
+    if isinstance(value, np.ndarray):
+        return {
+            "__array__": {
+                "dtype": value.dtype.str,
+                "shape": list(value.shape),
+                "data": base64.b64encode(value.tobytes()).decode(),
+            }
+        }
+
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# Define a function to convert the values encoded by _encode_value() back
+def _decode_object(data):
+    if "__timeline__" in data:
+        return Timeline.from_dict(data["__timeline__"])
+    if "__array__" in data:
+        array = data["__array__"]
+        return np.frombuffer(
+            base64.b64decode(array["data"]), dtype=array["dtype"]
+        ).reshape(array.get("shape", -1))
+
+    return data
+
+
+# Define a function to get a file name from a meeting hash and the settings it was transcribed with
+def content_file_name(content_hash, variant):
+    if not re.fullmatch(r"[0-9a-f]{64}", content_hash):
+        raise ValueError(f"Invalid SHA-256 hash: {content_hash!r}")
+
+    # Different models and settings give different transcriptions of the same meeting, so each variant gets its own name
+    variant_slug = re.sub(r"[^A-Za-z0-9_.+-]", "--", variant)
+
+    return f"{content_hash}.{variant_slug}"
+
+
+# Define a function to convert data that may hold timelines and arrays to a JSON string
+def dumps(data):
+    return json.dumps(data, ensure_ascii=False, default=_encode_value)
+
+
+# Define a function to convert a JSON string made by dumps() back
+def loads(text):
+    return json.loads(text, object_hook=_decode_object)
+
+
+# Define a function to read a JSON file that may hold timelines and arrays, or None if it doesn't exist or is damaged
+def read_json(path):
+    try:
+        with open(path, encoding="utf-8") as file:
+            return json.load(file, object_hook=_decode_object)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+# Define a function to write a JSON file that may hold timelines and arrays
+# The data is written to a temporary file first and then renamed, so readers never see a half-written file
+def write_json(path, data):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False, default=_encode_value)
+        os.replace(temporary_path, path)
+    except BaseException:
+        try:
+            os.remove(temporary_path)
+        except FileNotFoundError:
+            pass
+        raise
@@ -0,0 +1,259 @@
+# Import libraries
+import hashlib
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from utils import config
+
+
+# Define an error raised when Snowflake credentials are missing
+class MissingCredentialsError(ValueError):
+    pass
+
+
+# Define a function to get the key Snowflake sessions are pooled under
+# Sessions are only shared between users with the same credentials, and the credentials are hashed so they're not kept as plain text in the pool
+def _credentials_key(connection_params):
+    if not all(connection_params.get(name) for name in ("account", "user", "password")):
+        raise MissingCredentialsError(
+            "Please set your Snowflake account, user and password to analyze transcriptions."
+        )
+
+    return hashlib.sha256(
+        "\0".join(
+            f"{name}={connection_params[name]}" for name in sorted(connection_params)
+        ).encode("utf-8")
+    ).hexdigest()
+
+
+# Define a function to tell whether an error of a task means that its Snowflake session can't be used anymore
+# Only connection errors break a session, while errors of a query (like an input that's too long) leave it usable
+# Snowpark wraps the errors of the Snowflake connector, so the errors they were raised from are checked too
+def _is_connection_error(error, session):
+    from snowflake.connector.errors import InterfaceError, OperationalError
+    from snowflake.snowpark.exceptions import SnowparkSessionException
+
+    try:
+        if session.connection.is_closed():
+            return True
+    except Exception:
+        return True
+
+    errors = [error]
+    seen = set()
+    while errors:
+        error = errors.pop()
+        if error is None or id(error) in seen:
+            continue
+        seen.add(id(error))
+
+        if isinstance(
+            error, (InterfaceError, OperationalError, SnowparkSessionException)
+        ):
+            return True
+
+        errors.extend(
+            [getattr(error, "conn_error", None), error.__cause__, error.__context__]
+        )
+
+    return False
+
+
+# Define an open Snowflake session waiting in the pool
+class _PooledSession:
+    def __init__(self, key, session):
+        self.key = key
+        self.session = session
+        self.last_used_at = time.time()
+        self.last_checked_at = self.last_used_at
+
+
+# Define a process-wide pool of Snowflake sessions shared across reruns and sessions
+# A session is used by one task at a time, kept open after use, checked before it's reused if it wasn't used for a while, and closed once it's idle for too long
+class SnowflakeSessionPool:
+    def __init__(self, max_size, idle_timeout_s, health_check_interval_s):
+        self.max_size = max_size
+        self.idle_timeout_s = idle_timeout_s
+        self.health_check_interval_s = health_check_interval_s
+        self._idle = {}
+        self._size = 0
+        self._condition = threading.Condition()
+
+    # Define a function to create a Snowflake session
+    # Snowpark is imported here, so pages that never call Snowflake don't pay for importing it
+    def _create(self, connection_params):
+        from snowflake.snowpark import Session
+
+        return Session.builder.configs(connection_params).create()
+
+    # Define a function to close a Snowflake session, ignoring errors of sessions that are already broken
+    def _close(self, pooled_session):
+        try:
+            pooled_session.session.close()
+        except Exception:
+            pass
+
+    # Define a function to tell whether a session is broken by an error of its task
+    def _is_broken(self, pooled_session, error):
+        return _is_connection_error(error, pooled_session.session)
+
+    # Define a function to check that a Snowflake session still works
+    def _is_healthy(self, pooled_session):
+        if time.time() - pooled_session.last_checked_at < self.health_check_interval_s:
+            return True
+
+        try:
+            pooled_session.session.sql("SELECT 1").collect()
+        except Exception:
+            return False
+
+        pooled_session.last_checked_at = time.time()
+        return True
+
+    # Define a function to take the idle sessions that timed out out of the pool
+    # Returns the sessions to close, which are closed outside the lock
+    def _take_expired(self):
+        now = time.time()
+        expired = []
+        for key, idle_sessions in list(self._idle.items()):
+            while (
+                idle_sessions
+                and now - idle_sessions[0].last_used_at > self.idle_timeout_s
+            ):
+                expired.append(idle_sessions.popleft())
+            if not idle_sessions:
+                del self._idle[key]
+
+        self._size -= len(expired)
+        return expired
+
+    # Define a function to take the least recently used idle session of other credentials out of the pool, to make room
+    def _take_least_recently_used(self):
+        candidates = [
+            idle_sessions[0] for idle_sessions in self._idle.values() if idle_sessions
+        ]
+        if not candidates:
+            return None
+
+        pooled_session = min(candidates, key=lambda candidate: candidate.last_used_at)
+        self._idle[pooled_session.key].popleft()
+        if not self._idle[pooled_session.key]:
+            del self._idle[pooled_session.key]
+        self._size -= 1
+
+        return pooled_session
+
+    # Define a function to get a Snowflake session for the given credentials, reusing an idle one if possible
+    def acquire(self, connection_params):
+        key = _credentials_key(connection_params)
+
+        while True:
+            to_close = []
+            pooled_session = None
+            with self._condition:
+                while True:
+                    to_close.extend(self._take_expired())
+
+                    # Reuse the most recently used idle session, since it's the most likely to still be healthy
+                    idle_sessions = self._idle.get(key)
+                    if idle_sessions:
+                        pooled_session = idle_sessions.pop()
+                        if not idle_sessions:
+                            del self._idle[key]
+                        break
+
+                    # Open a new session if there's room, making room by closing an idle session of other credentials if needed
+                    if self._size >= self.max_size:
+                        evicted_session = self._take_least_recently_used()
+                        if evicted_session is not None:
+                            to_close.append(evicted_session)
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+
+                    # Otherwise, wait until a session is released
+                    self._condition.wait()
+
+            for expired_session in to_close:
+                self._close(expired_session)
+
+            if pooled_session is None:
+                try:
+                    return _PooledSession(key, self._create(connection_params))
+                except BaseException:
+                    with self._condition:
+                        self._size -= 1
+                        self._condition.notify()
+                    raise
+
+            if self._is_healthy(pooled_session):
+                return pooled_session
+
+            # The session is broken, so close it and try again
+            self._close(pooled_session)
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+
+    # Define a function to give a session back to the pool
+    # A broken session is closed instead
+    def release(self, pooled_session, broken=False):
+        if broken:
+            self._close(pooled_session)
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            return
+
+        pooled_session.last_used_at = time.time()
+        pooled_session.last_checked_at = pooled_session.last_used_at
+        with self._condition:
+            self._idle.setdefault(pooled_session.key, deque()).append(pooled_session)
+            self._condition.notify()
+
+    # Define a function to use a Snowflake session from the pool for a task
+    # The session goes back to the pool unless the task failed with a connection error, so failed queries and interrupted reruns don't cost a new connection
+    @contextmanager
+    def session(self, connection_params):
+        pooled_session = self.acquire(connection_params)
+        broken = False
+        try:
+            yield pooled_session.session
+        except Exception as error:
+            broken = self._is_broken(pooled_session, error)
+            raise
+        finally:
+            self.release(pooled_session, broken=broken)
+
+    # Define a function to get the number of open sessions and of idle sessions in the pool
+    def stats(self):
+        with self._condition:
+            return {
+                "open": self._size,
+                "idle": sum(
+                    len(idle_sessions) for idle_sessions in self._idle.values()
+                ),
+                "max_size": self.max_size,
+            }
+
+
+# Process-wide session pool, created on first use
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# Define a function to get the process-wide session pool
+def get_session_pool():
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = SnowflakeSessionPool(
+                config.SNOWFLAKE_POOL_MAX_SIZE,
+                config.SNOWFLAKE_SESSION_IDLE_TIMEOUT_S,
+                config.SNOWFLAKE_HEALTH_CHECK_INTERVAL_S,
+            )
+
+    return _pool
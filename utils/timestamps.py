@@ -0,0 +1,203 @@
+# Import libraries
+import base64
+import re
+
+import numpy as np
+
+# Punctuation that ends a sentence, used to group words into segments
+_SENTENCE_END = re.compile(r"[.?!…]\s*$")
+
+
+# Define a compact, column-oriented timeline of transcribed items (words or segments)
+# Instead of a dict per item, the texts of all items are kept in one string and the item boundaries in arrays:
+# item i is text[offsets[i]:offsets[i + 1]] and is spoken from starts[i] to ends[i] (in seconds of the original meeting)
+class Timeline:
+    __slots__ = ("text", "starts", "ends", "offsets")
+
+    def __init__(self, text, starts, ends, offsets):
+        self.text = text
+        self.starts = np.asarray(starts, dtype=np.float32)
+        self.ends = np.asarray(ends, dtype=np.float32)
+        self.offsets = np.asarray(offsets, dtype=np.int32)
+
+    # Define a function to build a timeline from the texts and times of its items
+    @classmethod
+    def from_items(cls, texts, starts, ends):
+        lengths = np.fromiter((len(text) for text in texts), dtype=np.int32)
+        offsets = np.concatenate(([0], np.cumsum(lengths, dtype=np.int32)))
+
+        return cls("".join(texts), starts, ends, offsets)
+
+    # Define a function to build an empty timeline
+    @classmethod
+    def empty(cls):
+        return cls("", [], [], [0])
+
+    # Define a function to join consecutive timelines into one
+    @classmethod
+    def concatenate(cls, timelines):
+        timelines = [timeline for timeline in timelines if len(timeline) > 0]
+        if not timelines:
+            return cls.empty()
+
+        offsets = [timelines[0].offsets]
+        text_length = int(timelines[0].offsets[-1])
+        for timeline in timelines[1:]:
+            offsets.append(timeline.offsets[1:] + text_length)
+            text_length += int(timeline.offsets[-1])
+
+        return cls(
+            "".join(timeline.text for timeline in timelines),
+            np.concatenate([timeline.starts for timeline in timelines]),
+            np.concatenate([timeline.ends for timeline in timelines]),
+            np.concatenate(offsets),
+        )
+
+    def __len__(self):
+        return self.starts.shape[0]
+
+    # Define a function to get the text, start and end of an item
+    def __getitem__(self, index):
+        return (
+            self.text[self.offsets[index] : self.offsets[index + 1]],
+            float(self.starts[index]),
+            float(self.ends[index]),
+        )
+
+    # Define a function to get the texts of all items
+    def texts(self):
+        offsets = self.offsets.tolist()
+
+        return [self.text[start:end] for start, end in zip(offsets, offsets[1:])]
+
+    # Define a function to get the items of a range of indexes as a new timeline
+    def slice(self, start_index, end_index):
+        offsets = self.offsets[start_index : end_index + 1]
+        if offsets.shape[0] == 0:
+            return Timeline.empty()
+
+        return Timeline(
+            self.text[offsets[0] : offsets[-1]],
+            self.starts[start_index:end_index],
+            self.ends[start_index:end_index],
+            offsets - offsets[0],
+        )
+
+    # Define a function to get the items spoken (at least partly) between two points in time, without searching item by item
+    def window(self, start_s, end_s):
+        start_index = int(np.searchsorted(self.ends, start_s, side="right"))
+        end_index = int(np.searchsorted(self.starts, end_s, side="left"))
+
+        return self.slice(start_index, max(start_index, end_index))
+
+    # Define a function to get the index of the item spoken at a point in time, or the next one
+    def seek(self, time_s):
+        return int(np.searchsorted(self.ends, time_s, side="right"))
+
+    # Number of bytes the timeline takes (the text is counted as UTF-8)
+    @property
+    def nbytes(self):
+        return (
+            len(self.text.encode("utf-8"))
+            + self.starts.nbytes
+            + self.ends.nbytes
+            + self.offsets.nbytes
+        )
+
+    # Define a function to convert the timeline to a JSON-serializable dictionary
+    # The arrays are stored as base64-encoded little-endian bytes, which is much smaller than lists of numbers
+    def to_dict(self):
+        return {
+            "text": self.text,
+            "starts": base64.b64encode(self.starts.astype("<f4").tobytes()).decode(),
+            "ends": base64.b64encode(self.ends.astype("<f4").tobytes()).decode(),
+            "offsets": base64.b64encode(self.offsets.astype("<i4").tobytes()).decode(),
+        }
+
+    # Define a function to build a timeline from a dictionary created by to_dict()
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data["text"],
+            np.frombuffer(base64.b64decode(data["starts"]), dtype="<f4"),
+            np.frombuffer(base64.b64decode(data["ends"]), dtype="<f4"),
+            np.frombuffer(base64.b64decode(data["offsets"]), dtype="<i4"),
+        )
+
+
+# Define a function to build a timeline from the timestamped chunks returned by the ASR pipeline
+# The times of the chunks are relative to the audio that was transcribed, so they are shifted by its start in the meeting
+# If silence was skipped, the times are mapped back to the original meeting through the speech regions (in seconds of the meeting)
+def timeline_from_chunks(chunks, start_s, end_s, speech_regions=None):
+    if not chunks:
+        return Timeline.empty()
+
+    # Whisper leaves out the end of the last chunk if it runs until the end of the audio
+    texts = [chunk["text"] for chunk in chunks]
+    starts = np.array(
+        [
+            np.nan if chunk["timestamp"][0] is None else chunk["timestamp"][0]
+            for chunk in chunks
+        ],
+        dtype=np.float64,
+    )
+    ends = np.array(
+        [
+            np.nan if chunk["timestamp"][1] is None else chunk["timestamp"][1]
+            for chunk in chunks
+        ],
+        dtype=np.float64,
+    )
+    starts[0] = 0.0 if np.isnan(starts[0]) else starts[0]
+    starts = np.fmax.accumulate(np.where(np.isnan(starts), -np.inf, starts))
+
+    # A missing end is filled with the start of the next chunk, or with the length of the transcribed audio for the last chunk
+    # If silence was skipped, only the speech was transcribed, so its length is the total length of the speech regions
+    if speech_regions:
+        regions = np.asarray(speech_regions, dtype=np.float64)
+        audio_length_s = float(np.sum(regions[:, 1] - regions[:, 0]))
+    else:
+        audio_length_s = end_s - start_s
+    ends = np.where(np.isnan(ends), np.append(starts[1:], audio_length_s), ends)
+
+    if speech_regions:
+        from utils.vad import speech_to_original
+
+        starts = speech_to_original(starts, regions)
+        ends = speech_to_original(ends, regions, ends=True)
+    else:
+        starts = starts + start_s
+        ends = ends + start_s
+
+    return Timeline.from_items(
+        texts, np.minimum(starts, end_s), np.minimum(ends, end_s)
+    )
+
+
+# Define a function to group words into segments
+# A segment ends after a word that ends a sentence or before a pause of at least the given length
+def group_words(words, max_pause_s=1.0):
+    if len(words) == 0:
+        return Timeline.empty()
+
+    texts = words.texts()
+    pauses = np.append(words.starts[1:] - words.ends[:-1], np.inf)
+    sentence_ends = np.fromiter(
+        (bool(_SENTENCE_END.search(text)) for text in texts),
+        dtype=bool,
+        count=len(texts),
+    )
+    last_words = np.flatnonzero(sentence_ends | (pauses >= max_pause_s))
+    if last_words.shape[0] == 0 or last_words[-1] != len(words) - 1:
+        last_words = np.append(last_words, len(words) - 1)
+    first_words = np.concatenate(([0], last_words[:-1] + 1))
+
+    offsets = words.offsets.tolist()
+    segment_texts = [
+        words.text[offsets[first] : offsets[last + 1]]
+        for first, last in zip(first_words.tolist(), last_words.tolist())
+    ]
+
+    return Timeline.from_items(
+        segment_texts, words.starts[first_words], words.ends[last_words]
+    )
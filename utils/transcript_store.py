@@ -0,0 +1,563 @@
+# Import libraries
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import closing, contextmanager
+from datetime import datetime
+
+from utils import config
+from utils.compressed_text import CompressedText
+from utils.serialization import dumps, loads
+
+# Columns of a transcript that are cheap to load, used to list transcripts without their text
+_METADATA_COLUMNS = "id, content_hash, variant, name, created_at, duration_s, language, text_length, preview"
+
+# Number of characters of the text kept uncompressed as a preview, so transcripts can be listed without decompressing them
+_PREVIEW_LENGTH = 200
+
+# Schema of the transcript catalog
+# The text and the timestamps are stored zlib-compressed, so long meetings take a fraction of the space
+# The full-text search index only keeps the tokens of the names and the texts, not the texts themselves
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS transcripts (
+        id INTEGER PRIMARY KEY,
+        content_hash TEXT NOT NULL,
+        variant TEXT NOT NULL,
+        name TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        duration_s REAL,
+        language TEXT,
+        text_length INTEGER NOT NULL,
+        preview TEXT NOT NULL,
+        text BLOB NOT NULL,
+        timestamps BLOB
+    );
+    CREATE INDEX IF NOT EXISTS transcripts_created_at ON transcripts (created_at);
+    CREATE UNIQUE INDEX IF NOT EXISTS transcripts_content_hash_variant
+        ON transcripts (content_hash, variant);
+    CREATE TABLE IF NOT EXISTS analyses (
+        transcript_id INTEGER PRIMARY KEY REFERENCES transcripts (id) ON DELETE CASCADE,
+        updated_at REAL NOT NULL,
+        summary TEXT,
+        keywords TEXT,
+        agenda TEXT,
+        participants TEXT,
+        sentiment TEXT,
+        translation TEXT,
+        translation_from TEXT,
+        translation_to TEXT
+    );
+    CREATE VIRTUAL TABLE IF NOT EXISTS transcripts_search USING fts5 (
+        name, text, content = '', tokenize = 'porter unicode61 remove_diacritics 2'
+    );
+"""
+
+# Table the snippets of a page of search results are made in
+# The search index is contentless, so it doesn't keep a second, uncompressed copy of every text, and the snippets are made from the decompressed texts of the results instead
+_SNIPPETS_SCHEMA = """
+    CREATE VIRTUAL TABLE temp.search_snippets USING fts5 (
+        name, text, tokenize = 'porter unicode61 remove_diacritics 2'
+    )
+"""
+
+# Results of the analysis of a transcript in Step 3
+# A transcript has one analysis, and every analysis feature that is run again replaces its earlier result
+_ANALYSIS_COLUMNS = (
+    "summary",
+    "keywords",
+    "agenda",
+    "participants",
+    "sentiment",
+    "translation",
+    "translation_from",
+    "translation_to",
+)
+
+# Weights of the name and the text of a transcript when search results are ranked
+_SEARCH_WEIGHTS = (5.0, 1.0)
+
+# Number of words around the matches shown in a search result
+_SNIPPET_WORDS = 24
+
+# Characters the matches in the snippet of a search result are enclosed in
+# They're control characters, so they never appear in a transcription and the caller can escape the snippet before it marks the matches
+SNIPPET_MATCH_START = "\x02"
+SNIPPET_MATCH_END = "\x03"
+
+# Paths of the databases whose schema is already created in this process
+_initialized_paths = set()
+_initialize_lock = threading.Lock()
+
+
+# Define a function to compress a text
+def _compress(text):
+    return zlib.compress(text.encode("utf-8"))
+
+
+# Define a function to decompress a text compressed by _compress()
+def _decompress(data):
+    return zlib.decompress(data).decode("utf-8")
+
+
+# Define a function to open a connection to the transcript catalog, creating it on first use
+# Every call gets its own connection, so the catalog can be used from any Streamlit script thread or job thread
+@contextmanager
+def _connect():
+    path = config.TRANSCRIPT_DB_PATH
+
+    with _initialize_lock:
+        if path not in _initialized_paths:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with closing(sqlite3.connect(path)) as connection:
+                # Write-ahead logging lets sessions read while a job stores a transcript
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.executescript(_SCHEMA)
+            _initialized_paths.add(path)
+
+    with closing(sqlite3.connect(path, timeout=30)) as connection:
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA foreign_keys = ON")
+        with connection:
+            yield connection
+
+
+# Define a function to get the preview of a text
+def _preview(text):
+    text = " ".join(text.split())
+    if len(text) <= _PREVIEW_LENGTH:
+        return text
+    return text[: _PREVIEW_LENGTH - 1].rstrip() + "…"
+
+
+# Define a function to remove a transcript from the search index
+# A contentless index can only remove the tokens of a row if it's given the name and the text the row was indexed with
+def _unindex(connection, transcript_id, name, compressed_text):
+    connection.execute(
+        "INSERT INTO transcripts_search (transcripts_search, rowid, name, text) VALUES ('delete', ?, ?, ?)",
+        (transcript_id, name, _decompress(compressed_text)),
+    )
+
+
+# Define a function to convert a row of the catalog to a dictionary
+def _to_dict(row):
+    return None if row is None else dict(row)
+
+
+# Define a function to store a transcript on an open connection and get its id
+# The timestamps are passed as JSON made by dumps()
+def _insert(
+    connection,
+    content_hash,
+    variant,
+    name,
+    text,
+    duration_s,
+    language,
+    timestamps_json,
+    created_at,
+):
+    # Remove the transcript this one replaces from the search index
+    replaced = connection.execute(
+        "SELECT id, name, text FROM transcripts WHERE content_hash = ? AND variant = ?",
+        (content_hash, variant),
+    ).fetchone()
+    if replaced is not None:
+        _unindex(connection, replaced[0], replaced[1], replaced[2])
+
+    transcript_id = connection.execute(
+        """
+            INSERT INTO transcripts (
+                content_hash, variant, name, created_at, duration_s, language, text_length, preview, text, timestamps
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (content_hash, variant) DO UPDATE SET
+                name = excluded.name,
+                created_at = excluded.created_at,
+                duration_s = excluded.duration_s,
+                language = excluded.language,
+                text_length = excluded.text_length,
+                preview = excluded.preview,
+                text = excluded.text,
+                timestamps = excluded.timestamps
+            RETURNING id
+        """,
+        (
+            content_hash,
+            variant,
+            name,
+            created_at,
+            duration_s,
+            language,
+            len(text),
+            _preview(text),
+            _compress(text),
+            None if timestamps_json is None else _compress(timestamps_json),
+        ),
+    ).fetchone()[0]
+
+    # Index the name and the text for full-text search
+    connection.execute(
+        "INSERT INTO transcripts_search (rowid, name, text) VALUES (?, ?, ?)",
+        (transcript_id, name, text),
+    )
+
+    return transcript_id
+
+
+# Define a function to store a transcript and get its id
+# A meeting transcribed again with the same settings replaces its earlier transcript instead of being listed twice
+def add(
+    content_hash,
+    variant,
+    name,
+    text,
+    duration_s=None,
+    language=None,
+    timestamps=None,
+    created_at=None,
+):
+    if created_at is None:
+        created_at = time.time()
+
+    with _connect() as connection:
+        return _insert(
+            connection,
+            content_hash,
+            variant,
+            name,
+            text,
+            duration_s,
+            language,
+            None if timestamps is None else dumps(timestamps),
+            created_at,
+        )
+
+
+# Define a function to get the metadata of a transcript, or None if it doesn't exist
+def get(transcript_id):
+    with _connect() as connection:
+        return _to_dict(
+            connection.execute(
+                f"SELECT {_METADATA_COLUMNS} FROM transcripts WHERE id = ?",
+                (transcript_id,),
+            ).fetchone()
+        )
+
+
+# Define a function to get the text of a transcript, or None if it doesn't exist
+def get_text(transcript_id):
+    with _connect() as connection:
+        row = connection.execute(
+            "SELECT text FROM transcripts WHERE id = ?", (transcript_id,)
+        ).fetchone()
+
+    return None if row is None else _decompress(row["text"])
+
+
+# Define a function to get the segment and word timestamps (and the speakers) of a transcript, or None if they weren't stored
+def get_timestamps(transcript_id):
+    with _connect() as connection:
+        row = connection.execute(
+            "SELECT timestamps FROM transcripts WHERE id = ?", (transcript_id,)
+        ).fetchone()
+
+    if row is None or row["timestamps"] is None:
+        return None
+
+    return loads(_decompress(row["timestamps"]))
+
+
+# Define a function to list the metadata and the preview of transcripts, newest first
+# Use limit and offset to list one page of transcripts at a time
+def list_transcripts(limit=-1, offset=0):
+    with _connect() as connection:
+        return [
+            dict(row)
+            for row in connection.execute(
+                f"SELECT {_METADATA_COLUMNS} FROM transcripts ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+                (limit, offset),
+            )
+        ]
+
+
+# Define a function to get the number of stored transcripts
+def count():
+    with _connect() as connection:
+        return connection.execute("SELECT COUNT(*) FROM transcripts").fetchone()[0]
+
+
+# Define a function to store the results of analysis features run on a transcript
+# Features that weren't run (None) keep their earlier result
+# The sentiment is a list of {"sentence", "sentiment"} dictionaries
+def save_analysis(transcript_id, **results):
+    unknown_columns = set(results) - set(_ANALYSIS_COLUMNS)
+    if unknown_columns:
+        raise ValueError(
+            f"Unknown analysis results: {', '.join(sorted(unknown_columns))}"
+        )
+
+    if results.get("sentiment") is not None:
+        results["sentiment"] = json.dumps(results["sentiment"], ensure_ascii=False)
+
+    with _connect() as connection:
+        _upsert_analysis(connection, transcript_id, time.time(), results)
+
+
+# Define a function to store the results of an analysis on an open connection
+def _upsert_analysis(connection, transcript_id, updated_at, results):
+    connection.execute(
+        f"""
+            INSERT INTO analyses (transcript_id, updated_at, {", ".join(_ANALYSIS_COLUMNS)})
+            VALUES (?, ?, {", ".join("?" * len(_ANALYSIS_COLUMNS))})
+            ON CONFLICT (transcript_id) DO UPDATE SET
+                updated_at = excluded.updated_at,
+                {", ".join(f"{column} = COALESCE(excluded.{column}, analyses.{column})" for column in _ANALYSIS_COLUMNS)}
+        """,
+        (
+            transcript_id,
+            updated_at,
+            *(results.get(column) for column in _ANALYSIS_COLUMNS),
+        ),
+    )
+
+
+# Define a function to get the stored analysis of a transcript, or None if it wasn't analyzed yet
+def get_analysis(transcript_id):
+    with _connect() as connection:
+        row = connection.execute(
+            "SELECT * FROM analyses WHERE transcript_id = ?", (transcript_id,)
+        ).fetchone()
+
+    if row is None:
+        return None
+
+    analysis = dict(row)
+    if analysis["sentiment"] is not None:
+        analysis["sentiment"] = json.loads(analysis["sentiment"])
+    return analysis
+
+
+# Define a function to get every stored transcript with its text and timestamps, for an export
+# Transcripts are identified by their content hash and variant, since ids differ between hosts
+def export_transcripts():
+    with _connect() as connection:
+        rows = connection.execute(
+            "SELECT content_hash, variant, name, created_at, duration_s, language, text, timestamps FROM transcripts ORDER BY id"
+        ).fetchall()
+
+    return [
+        {
+            **dict(row),
+            "text": _decompress(row["text"]),
+            "timestamps": (
+                None if row["timestamps"] is None else _decompress(row["timestamps"])
+            ),
+        }
+        for row in rows
+    ]
+
+
+# Define a function to store transcripts exported by export_transcripts(), all at once
+def import_transcripts(transcripts):
+    with _connect() as connection:
+        for transcript in transcripts:
+            _insert(
+                connection,
+                transcript["content_hash"],
+                transcript["variant"],
+                transcript["name"],
+                transcript["text"],
+                transcript.get("duration_s"),
+                transcript.get("language"),
+                transcript.get("timestamps"),
+                transcript.get("created_at") or time.time(),
+            )
+
+    return len(transcripts)
+
+
+# Define a function to get every stored analysis with the content hash and variant of its transcript, for an export
+def export_analyses():
+    with _connect() as connection:
+        rows = connection.execute(f"""
+                SELECT transcripts.content_hash, transcripts.variant, analyses.updated_at, {", ".join(f"analyses.{column}" for column in _ANALYSIS_COLUMNS)}
+                FROM analyses
+                JOIN transcripts ON transcripts.id = analyses.transcript_id
+                ORDER BY analyses.transcript_id
+            """).fetchall()
+
+    analyses = []
+    for row in rows:
+        analysis = dict(row)
+        if analysis["sentiment"] is not None:
+            analysis["sentiment"] = json.loads(analysis["sentiment"])
+        analyses.append(analysis)
+
+    return analyses
+
+
+# Define a function to store analyses exported by export_analyses(), all at once
+# Analyses of transcripts that aren't stored are skipped, so transcripts must be imported first
+def import_analyses(analyses):
+    imported = 0
+    with _connect() as connection:
+        transcript_ids = {
+            (row[0], row[1]): row[2]
+            for row in connection.execute(
+                "SELECT content_hash, variant, id FROM transcripts"
+            )
+        }
+        for analysis in analyses:
+            transcript_id = transcript_ids.get(
+                (analysis["content_hash"], analysis["variant"])
+            )
+            if transcript_id is None:
+                continue
+
+            results = {column: analysis.get(column) for column in _ANALYSIS_COLUMNS}
+            if results["sentiment"] is not None:
+                results["sentiment"] = json.dumps(
+                    results["sentiment"], ensure_ascii=False
+                )
+            _upsert_analysis(
+                connection,
+                transcript_id,
+                analysis.get("updated_at") or time.time(),
+                results,
+            )
+            imported += 1
+
+    return imported
+
+
+# Define a function to turn a search query typed by the user into an FTS5 query
+# Every word must match, and the last word also matches longer words, so results show up while the user is still typing
+def _match_expression(query):
+    words = re.findall(r"\w+", query)
+    if not words:
+        return None
+
+    return " ".join(f'"{word}"' for word in words) + "*"
+
+
+# Define a function to search the names and the texts of all transcripts
+# Returns the metadata of the best matching transcripts, best match first, each with a snippet of its text where the matches are enclosed in SNIPPET_MATCH_START and SNIPPET_MATCH_END
+def search(query, limit=20, offset=0):
+    match_expression = _match_expression(query)
+    if match_expression is None:
+        return []
+
+    with _connect() as connection:
+        # Rank all matches first, and make snippets only for the page of results that is returned, since making a snippet is much slower than ranking
+        ranked_ids = [
+            row[0]
+            for row in connection.execute(
+                """
+                    SELECT rowid FROM transcripts_search
+                    WHERE transcripts_search MATCH ?
+                    ORDER BY bm25(transcripts_search, ?, ?)
+                    LIMIT ? OFFSET ?
+                """,
+                (match_expression, *_SEARCH_WEIGHTS, limit, offset),
+            )
+        ]
+        if not ranked_ids:
+            return []
+
+        # The search index is contentless, so the results are indexed again with their decompressed texts to make their snippets
+        placeholders = ", ".join("?" * len(ranked_ids))
+        connection.execute(_SNIPPETS_SCHEMA)
+        connection.executemany(
+            "INSERT INTO search_snippets (rowid, name, text) VALUES (?, ?, ?)",
+            [
+                (row[0], row[1], _decompress(row[2]))
+                for row in connection.execute(
+                    f"SELECT id, name, text FROM transcripts WHERE id IN ({placeholders})",
+                    ranked_ids,
+                )
+            ],
+        )
+        snippets = dict(
+            connection.execute(
+                "SELECT rowid, snippet(search_snippets, 1, ?, ?, '…', ?) FROM search_snippets WHERE search_snippets MATCH ?",
+                (
+                    SNIPPET_MATCH_START,
+                    SNIPPET_MATCH_END,
+                    _SNIPPET_WORDS,
+                    match_expression,
+                ),
+            ).fetchall()
+        )
+        transcripts = {
+            row["id"]: dict(row)
+            for row in connection.execute(
+                f"SELECT {_METADATA_COLUMNS} FROM transcripts WHERE id IN ({placeholders})",
+                ranked_ids,
+            )
+        }
+
+    results = []
+    for transcript_id in ranked_ids:
+        transcript = transcripts[transcript_id]
+        transcript["snippet"] = snippets.get(transcript_id, "")
+        results.append(transcript)
+
+    return results
+
+
+# Define a handle to a stored transcript
+# The metadata is loaded when the handle is opened, and the text and the timestamps are loaded on first use and then kept, so a page can read them on every rerun without querying the catalog again
+# The text is kept as compressed blocks, which are decompressed on demand through a small cache shared by all sessions
+class Transcript:
+    def __init__(self, metadata):
+        self.id = metadata["id"]
+        self.metadata = metadata
+        self._text = None
+        self._timestamps = None
+        self._timestamps_loaded = False
+
+    @property
+    def label(self):
+        return label(self.metadata)
+
+    @property
+    def compressed_text(self):
+        if self._text is None:
+            text = get_text(self.id)
+            if text is None:
+                return None
+            self._text = CompressedText(text)
+        return self._text
+
+    @property
+    def text(self):
+        compressed_text = self.compressed_text
+        return None if compressed_text is None else compressed_text.text
+
+    @property
+    def timestamps(self):
+        if not self._timestamps_loaded:
+            self._timestamps = get_timestamps(self.id)
+            self._timestamps_loaded = True
+        return self._timestamps
+
+    # Define a function to check that the transcript is still stored as it was when the handle was opened
+    # A transcript keeps its id when the meeting is transcribed again or an import replaces it, so its stored metadata is compared instead, which doesn't load the text
+    def is_current(self):
+        return get(self.id) == self.metadata
+
+
+# Define a function to open a handle to a stored transcript, or None if it doesn't exist
+def open_transcript(transcript_id):
+    metadata = get(transcript_id)
+    return None if metadata is None else Transcript(metadata)
+
+
+# Define a function to get the label a transcript is shown with
+def label(transcript):
+    created_at = datetime.fromtimestamp(transcript["created_at"])
+    return f"{created_at.strftime('%Y-%m-%d %H:%M:%S')} – {transcript['name']}"
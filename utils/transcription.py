@@ -0,0 +1,226 @@
+# Import libraries
+from collections import Counter, deque
+
+import numpy as np
+
+from utils import checkpoints, config
+from utils.asr import transcribe
+from utils.asr_pool import iter_transcribed_segments
+from utils.audio import iter_audio_segments
+from utils.diarization import embed_segments, label_speakers
+from utils.timestamps import Timeline, group_words, timeline_from_chunks
+from utils.vad import detect_speech, extract_speech
+
+
+# Define a function to join the texts of consecutive segments
+def join_texts(texts):
+    return " ".join(text.strip() for text in texts if text.strip())
+
+
+# Define a function to get the name of the settings a transcription is made with, used to tell cached transcriptions apart
+def transcription_variant(model_name=None, vad=False, diarize=False):
+    if model_name is None:
+        model_name = config.ASR_MODEL
+
+    variant = model_name
+    if config.ASR_QUANTIZE:
+        variant += "+int8"
+    if vad:
+        variant += "+vad"
+    if diarize:
+        variant += "+diarization"
+
+    return variant
+
+
+# Define a function to get the language of a transcription as an ISO 639-1 code, or None if it's unknown
+# Multilingual models detect the language of every segment, and English-only models are named with an ".en" suffix
+def transcription_language(transcription, model_name=None):
+    if transcription.get("language"):
+        return transcription["language"]
+
+    if model_name is None:
+        model_name = config.ASR_MODEL
+
+    return "en" if model_name.endswith(".en") else None
+
+
+# Define a function to stream the audio segments of a meeting together with their position in the meeting
+# With voice activity detection, only the speech of every segment is sent to the model, and the speech regions are collected in seconds of the original meeting
+# Segments already checkpointed in checkpoint_dir are yielded as they were transcribed, without audio, so they're not transcribed again
+# Yields the index of the segment, the segment, the audio to send to the model and the original audio of the segment
+def _iter_audio_segments(meeting_path, vad, checkpoint_dir=None):
+    offset = 0
+    for index, audio in enumerate(
+        iter_audio_segments(meeting_path, config.ASR_SEGMENT_LENGTH_S)
+    ):
+        start_s = offset / config.SAMPLING_RATE
+        offset += audio.shape[0]
+        segment = {
+            "start_s": start_s,
+            "end_s": offset / config.SAMPLING_RATE,
+            "skipped_s": 0.0,
+        }
+
+        # The meeting is still decoded up to the last checkpointed segment, since the cut between segments depends on the audio
+        # A checkpoint that doesn't line up with the decoded segment is stale and transcribed again
+        if checkpoint_dir is not None:
+            checkpoint = checkpoints.load_segment(checkpoint_dir, index)
+            if (
+                checkpoint is not None
+                and checkpoint["start_s"] == segment["start_s"]
+                and checkpoint["end_s"] == segment["end_s"]
+            ):
+                yield index, checkpoint, None, None
+                continue
+
+        speech = audio
+        if vad:
+            regions = detect_speech(audio)
+            speech = extract_speech(audio, regions)
+            segment["speech_regions"] = [
+                [
+                    start_s + start / config.SAMPLING_RATE,
+                    start_s + end / config.SAMPLING_RATE,
+                ]
+                for start, end in regions.tolist()
+            ]
+            segment["skipped_s"] = (
+                audio.shape[0] - speech.shape[0]
+            ) / config.SAMPLING_RATE
+
+        yield index, segment, speech, audio
+
+
+# Define a function to add the text and timelines of a transcribed segment to the segment
+# With speaker identification, a speaker embedding is also computed for every transcript segment from the original audio
+def _add_transcription(segment, transcription, audio, diarize):
+    segment["text"] = transcription["text"]
+    segment["language"] = transcription.get("language")
+    segment["timeline"] = timeline_from_chunks(
+        transcription.get("chunks", []),
+        segment["start_s"],
+        segment["end_s"],
+        segment.get("speech_regions"),
+    )
+    if config.ASR_TIMESTAMPS == "word":
+        segment["segments"] = group_words(segment["timeline"])
+    else:
+        segment["segments"] = segment["timeline"]
+
+    if diarize:
+        segment["speaker_embeddings"] = embed_segments(
+            audio, segment["start_s"], segment["segments"]
+        )
+
+    return segment
+
+
+# Define a function to get a transcription of a meeting on disk segment by segment
+# Only the audio of the meeting is decoded, one segment at a time, and the segments are fed to the model as they are decoded
+# Every segment is yielded as soon as it's transcribed, in order, so its text can be shown while the rest of the meeting is still being transcribed
+# With more than one worker, the segments are transcribed in parallel on worker processes
+# With a checkpoint directory, every transcribed segment is checkpointed, and a retried transcription resumes after the last checkpointed segment
+# With a cancel event from create_cancel_event(), the model stops as soon as it's set and TranscriptionCancelledError is raised
+def iter_transcription(
+    meeting_path,
+    model_name=None,
+    vad=False,
+    diarize=False,
+    checkpoint_dir=None,
+    cancel_event=None,
+):
+    audio_segments = _iter_audio_segments(meeting_path, vad, checkpoint_dir)
+
+    def finish_segment(index, segment, transcription, audio):
+        segment = _add_transcription(segment, transcription, audio, diarize)
+        if checkpoint_dir is not None:
+            checkpoints.save_segment(checkpoint_dir, index, segment)
+        return segment
+
+    try:
+        if config.ASR_WORKERS <= 1:
+            for index, segment, speech, audio in audio_segments:
+                if speech is None:
+                    yield segment
+                    continue
+                transcription = transcribe(
+                    speech, model_name=model_name, cancel_event=cancel_event
+                )
+                yield finish_segment(index, segment, transcription, audio)
+            return
+
+        # The transcriptions come back in the order the segments were submitted
+        # Checkpointed segments are queued in between without being submitted, so all segments are yielded in order
+        submitted_segments = deque()
+
+        def iter_submitted_audio():
+            for index, segment, speech, audio in audio_segments:
+                submitted_segments.append(
+                    (index, segment, speech is not None, audio if diarize else None)
+                )
+                if speech is not None:
+                    yield speech
+
+        def iter_checkpointed_segments():
+            while submitted_segments and not submitted_segments[0][2]:
+                yield submitted_segments.popleft()[1]
+
+        transcriptions = iter_transcribed_segments(
+            iter_submitted_audio(), model_name=model_name, cancel_event=cancel_event
+        )
+        try:
+            for transcription in transcriptions:
+                yield from iter_checkpointed_segments()
+                index, segment, _, audio = submitted_segments.popleft()
+                yield finish_segment(index, segment, transcription, audio)
+            yield from iter_checkpointed_segments()
+        finally:
+            transcriptions.close()
+    finally:
+        # Stop decoding if the segments are not consumed until the end
+        audio_segments.close()
+
+
+# Define a function to build a transcription from its transcribed segments
+# The timestamps are kept as compact timelines next to the text: "segments" always, and "words" if word timestamps were requested
+# With speaker identification, "speakers" holds the speaker of every transcript segment
+def build_transcription(segments):
+    transcription = {
+        "text": join_texts(segment["text"] for segment in segments),
+        "duration_s": segments[-1]["end_s"] if segments else 0.0,
+        "skipped_s": sum(segment["skipped_s"] for segment in segments),
+        "segments": Timeline.concatenate(segment["segments"] for segment in segments),
+    }
+
+    # The language of the meeting is the language detected in most of its transcribed time
+    language_durations = Counter()
+    for segment in segments:
+        if segment.get("language"):
+            language_durations[segment["language"]] += (
+                segment["end_s"] - segment["start_s"] - segment["skipped_s"]
+            )
+    if language_durations:
+        transcription["language"] = language_durations.most_common(1)[0][0]
+
+    if config.ASR_TIMESTAMPS == "word":
+        transcription["words"] = Timeline.concatenate(
+            segment["timeline"] for segment in segments
+        )
+
+    # Cluster the speaker embeddings of the whole meeting at once, so speakers are recognized across segments
+    if any("speaker_embeddings" in segment for segment in segments):
+        transcription["speakers"] = label_speakers(
+            np.concatenate(
+                [segment["speaker_embeddings"] for segment in segments], axis=0
+            )
+        )
+
+    if any("speech_regions" in segment for segment in segments):
+        transcription["speech_regions"] = [
+            region
+            for segment in segments
+            for region in segment.get("speech_regions", [])
+        ]
+
+    return transcription
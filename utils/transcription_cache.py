@@ -0,0 +1,78 @@
+# Import libraries
+import os
+import threading
+
+from utils import config
+from utils.serialization import content_file_name, read_json, write_json
+
+# Suffix of the files holding cached transcriptions
+_ENTRY_SUFFIX = ".json"
+
+# Lock to serialize evictions within this process
+_eviction_lock = threading.Lock()
+
+
+# Define a function to get the path of the cache entry for a meeting hash and the settings it was transcribed with
+def _entry_path(content_hash, variant):
+    return os.path.join(
+        config.TRANSCRIPTION_CACHE_DIR,
+        content_file_name(content_hash, variant) + _ENTRY_SUFFIX,
+    )
+
+
+# Define a function to get a cached transcription, or None if the meeting hasn't been transcribed yet
+# The variant names the model and the options the meeting was transcribed with, so every combination has its own entry
+def get(content_hash, variant):
+    path = _entry_path(content_hash, variant)
+    transcription = read_json(path)
+    if transcription is None:
+        return None
+
+    # Mark the entry as recently used, so it's evicted last
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+
+    return transcription
+
+
+# Define a function to store a transcription in the cache
+def put(content_hash, transcription, variant, max_bytes=None):
+    write_json(_entry_path(content_hash, variant), transcription)
+
+    evict(max_bytes)
+
+
+# Define a function to remove the least recently used entries until the cache fits into its size budget
+def evict(max_bytes=None):
+    if max_bytes is None:
+        max_bytes = config.TRANSCRIPTION_CACHE_MAX_BYTES
+
+    with _eviction_lock:
+        entries = []
+        total_bytes = 0
+        try:
+            with os.scandir(config.TRANSCRIPTION_CACHE_DIR) as directory:
+                for entry in directory:
+                    if not entry.name.endswith(_ENTRY_SUFFIX):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total_bytes += stat.st_size
+        except FileNotFoundError:
+            return
+
+        # Remove the oldest entries first
+        entries.sort()
+        for _, size, path in entries:
+            if total_bytes <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
@@ -0,0 +1,49 @@
+# Import libraries
+import hashlib
+import os
+import tempfile
+
+from utils import config
+
+
+# Define a function to spool an uploaded meeting to a temporary file on disk
+# The meeting is copied in fixed-size chunks, so the copy doesn't need more memory than one chunk on top of the upload itself
+# Streamlit keeps holding the whole upload in memory until it's removed from the uploader or the session ends, so the total size of an upload is capped by the caller
+# The SHA-256 hash of the meeting is computed incrementally while the chunks are written
+# Returns the path of the spooled meeting and its hash
+def spool_upload(uploaded_file, chunk_size=None):
+    if chunk_size is None:
+        chunk_size = config.UPLOAD_CHUNK_SIZE
+
+    os.makedirs(config.SPOOL_DIR, exist_ok=True)
+
+    # Keep the original extension so that ffmpeg can detect the container format
+    suffix = os.path.splitext(uploaded_file.name)[1]
+    spool_file = tempfile.NamedTemporaryFile(
+        dir=config.SPOOL_DIR, prefix="meeting_", suffix=suffix, delete=False
+    )
+
+    sha256 = hashlib.sha256()
+    try:
+        with spool_file:
+            uploaded_file.seek(0)
+            while True:
+                chunk = uploaded_file.read(chunk_size)
+                if not chunk:
+                    break
+                sha256.update(chunk)
+                spool_file.write(chunk)
+    except BaseException:
+        # Don't leave half-written meetings behind
+        remove_spooled_upload(spool_file.name)
+        raise
+
+    return spool_file.name, sha256.hexdigest()
+
+
+# Define a function to remove a spooled meeting from disk
+def remove_spooled_upload(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
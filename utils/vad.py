@@ -0,0 +1,96 @@
+# Import libraries
+import numpy as np
+
+from utils import config
+
+
+# Define a function to get the start and end frames of the runs of True values in a boolean mask
+def _mask_to_regions(mask):
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+# Define a function to merge regions that are separated by gaps shorter than the given length
+def _merge_close_regions(starts, ends, min_gap):
+    if starts.shape[0] == 0:
+        return starts, ends
+
+    keep_gap = starts[1:] - ends[:-1] >= min_gap
+
+    return (
+        starts[np.concatenate(([True], keep_gap))],
+        ends[np.concatenate((keep_gap, [True]))],
+    )
+
+
+# Define a function to detect speech in 16 kHz mono audio samples
+# Every frame's energy is computed in one vectorized pass and compared with a threshold relative to the noise floor of the audio
+# Returns an array of [start, end) sample positions of speech regions
+def detect_speech(
+    audio,
+    sampling_rate=config.SAMPLING_RATE,
+    frame_length_ms=30,
+    threshold_db=12.0,
+    min_energy_db=-50.0,
+    min_speech_ms=250,
+    min_silence_ms=500,
+    padding_ms=200,
+):
+    frame_length = sampling_rate * frame_length_ms // 1000
+    frame_count = audio.shape[0] // frame_length
+    if frame_count == 0:
+        return np.empty((0, 2), dtype=np.int64)
+
+    # Energy of every frame in dBFS
+    frames = audio[: frame_count * frame_length].reshape(frame_count, frame_length)
+    energy_db = 10 * np.log10(
+        np.mean(np.square(frames, dtype=np.float64), axis=1) + 1e-10
+    )
+
+    # A frame is speech if it's clearly louder than the quietest frames, and not just quiet noise
+    noise_floor_db = np.percentile(energy_db, 10)
+    speech = energy_db > max(noise_floor_db + threshold_db, min_energy_db)
+
+    # Bridge short pauses between words, then drop short bursts of noise
+    starts, ends = _mask_to_regions(speech)
+    starts, ends = _merge_close_regions(
+        starts, ends, -(-min_silence_ms // frame_length_ms)
+    )
+    long_enough = ends - starts >= -(-min_speech_ms // frame_length_ms)
+    starts, ends = starts[long_enough], ends[long_enough]
+
+    # Pad the regions, so the beginnings and ends of words are not cut off, and merge regions that overlap afterwards
+    padding = padding_ms * sampling_rate // 1000
+    starts = np.maximum(starts * frame_length - padding, 0)
+    ends = np.minimum(ends * frame_length + padding, audio.shape[0])
+    starts, ends = _merge_close_regions(starts, ends, 1)
+
+    return np.stack((starts, ends), axis=1).astype(np.int64)
+
+
+# Define a function to keep only the speech regions of audio samples
+def extract_speech(audio, regions):
+    if regions.shape[0] == 0:
+        return audio[:0]
+
+    return np.concatenate([audio[start:end] for start, end in regions])
+
+
+# Define a function to map positions in the extracted speech back to positions in the original audio
+# Both the positions and the regions are in the same unit (samples or seconds)
+# Ends are mapped to the end of the previous region when they fall exactly between two regions
+def speech_to_original(positions, regions, ends=False):
+    positions = np.asarray(positions)
+    if regions.shape[0] == 0:
+        return positions
+
+    lengths = regions[:, 1] - regions[:, 0]
+    speech_starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    index = np.clip(
+        np.searchsorted(speech_starts, positions, side="left" if ends else "right") - 1,
+        0,
+        None,
+    )
+
+    return regions[index, 0] + (positions - speech_starts[index])